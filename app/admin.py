@@ -1,4 +1,5 @@
 from django.contrib import admin
 from .models import *
 
-admin.site.register(Category)
\ No newline at end of file
+admin.site.register(Category)
+admin.site.register(AssignmentAffinity)
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .choices import StatusChoices
+from .models import IssueDailyStats, IssueStatusCount
+
+RESOLVED_STATUSES = (StatusChoices.RESOLVED, StatusChoices.CLOSED)
+SNAPSHOT_FIELDS = (
+    'location_id', 'category_id', 'status', 'created_at', 'resolved_at', 'estimated_resolution_time', 'assigned_to_id',
+)
+
+
+def issue_snapshot(issue):
+    """The fields of ``issue`` the rollups and assignee workloads depend on, taken before or after a change."""
+    return {field: getattr(issue, field) for field in SNAPSHOT_FIELDS}
+
+
+def _contributions(snapshot):
+    """What one issue adds to each rollup row, as ``{(model, key): {field: value}}``."""
+    location, category = snapshot['location_id'], snapshot['category_id']
+    rows = {
+        (IssueStatusCount, (location, category, snapshot['status'])): {'count': 1},
+    }
+    created_day = timezone.localdate(snapshot['created_at'])
+    rows[(IssueDailyStats, (created_day, location, category))] = {'created': 1}
+    resolved_at = snapshot['resolved_at']
+    if resolved_at is not None and snapshot['status'] in RESOLVED_STATUSES:
+        seconds = max(int((resolved_at - snapshot['created_at']).total_seconds()), 0)
+        estimate = snapshot['estimated_resolution_time']
+        resolved = rows.setdefault((IssueDailyStats, (timezone.localdate(resolved_at), location, category)), {})
+        resolved.update({
+            'resolved': 1,
+            'resolution_seconds': seconds,
+            'sla_tracked': int(estimate is not None),
+            'sla_breached': int(estimate is not None and seconds > estimate.total_seconds()),
+        })
+    return rows
+
+
+def _key_filter(model, key):
+    if model is IssueStatusCount:
+        return dict(zip(('location_id', 'category_id', 'status'), key))
+    return dict(zip(('day', 'location_id', 'category_id'), key))
+
+
+def _apply(deltas):
+    for (model, key), fields in deltas.items():
+        fields = {name: value for name, value in fields.items() if value}
+        if not fields:
+            continue
+        lookup = _key_filter(model, key)
+        increments = {name: F(name) + value for name, value in fields.items()}
+        if model.objects.filter(**lookup).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **fields)
+        except IntegrityError:
+            model.objects.filter(**lookup).update(**increments)
+
+
+def record_issue_changes(changes):
+    """
+    Fold ``(before, after)`` issue snapshots into the rollup tables; ``before``
+    is None for a new issue and ``after`` is None for a deleted one. Only the
+    difference between the two contributions is written, so the rollups stay
+    equal to a full recount. Call inside the transaction that changes the issues.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for before, after in changes:
+        for sign, snapshot in ((-1, before), (1, after)):
+            if snapshot is None:
+                continue
+            for row, fields in _contributions(snapshot).items():
+                for name, value in fields.items():
+                    deltas[row][name] += sign * value
+    _apply(deltas)
+
+
+def rebuild_rollups(issues, batch_size=2000):
+    """
+    Recount the rollup tables from ``issues``. Changes committed while the
+    recount runs can be lost, so run it with issue writes paused. Returns the
+    number of issues read.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    total = 0
+    for snapshot in issues.values(*SNAPSHOT_FIELDS).iterator(chunk_size=batch_size):
+        total += 1
+        for row, fields in _contributions(snapshot).items():
+            for name, value in fields.items():
+                totals[row][name] += value
+    with transaction.atomic():
+        IssueStatusCount.objects.all().delete()
+        IssueDailyStats.objects.all().delete()
+        for model in (IssueStatusCount, IssueDailyStats):
+            model.objects.bulk_create(
+                [model(**_key_filter(model, key), **fields) for (row_model, key), fields in totals.items() if row_model is model],
+                batch_size=batch_size,
+            )
+    return total
@@ -0,0 +1,230 @@
+import math
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from .analytics import issue_snapshot
+from .cache import ReferenceCache
+from .choices import OPEN_STATUSES, NotificationChoices, RoleChoices, StatusChoices
+from .models import AssignmentAffinity, Issue, User
+from .notifications import notify
+
+# Rebalancing only moves issues nobody has started on.
+MOVABLE_STATUSES = (StatusChoices.REPORTED, StatusChoices.ACKNOWLEDGED)
+
+
+def _load_assignees():
+    affinities = defaultdict(list)
+    for user_id, category_id, location_id, weight in AssignmentAffinity.objects.values_list(
+        'user_id', 'category_id', 'location_id', 'weight'
+    ):
+        affinities[user_id].append((category_id, location_id, weight))
+    return [
+        {'id': user_id, 'affinities': affinities.get(user_id, [])}
+        for user_id in User.objects.filter(role=RoleChoices.MAINTENANCE, is_active=True)
+        .order_by('pk').values_list('pk', flat=True)
+    ]
+
+
+assignee_cache = ReferenceCache('assignee', _load_assignees)
+
+
+def _cache():
+    return caches[settings.ASSIGNMENT_CACHE_ALIAS]
+
+
+def _load_key(user_id):
+    return f'assign:load:{user_id}'
+
+
+def open_loads(user_ids):
+    """
+    Open issues per assignee from the cache. Entries that are missing are
+    filled from a single grouped COUNT and expire after
+    ASSIGNMENT_LOAD_TIMEOUT, which also corrects any drift.
+    """
+    keys = {user_id: _load_key(user_id) for user_id in user_ids}
+    cached = _cache().get_many(keys.values())
+    loads = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+    missing = [user_id for user_id in user_ids if user_id not in loads]
+    if missing:
+        counted = dict(
+            Issue.objects.filter(assigned_to__in=missing, status__in=OPEN_STATUSES)
+            .values('assigned_to').annotate(total=Count('pk')).values_list('assigned_to', 'total')
+        )
+        fresh = {user_id: counted.get(user_id, 0) for user_id in missing}
+        _cache().set_many({keys[user_id]: load for user_id, load in fresh.items()}, settings.ASSIGNMENT_LOAD_TIMEOUT)
+        loads.update(fresh)
+    return loads
+
+
+def forget_loads(user_ids):
+    """Drop cached open-issue counts so the next read recounts them."""
+    _cache().delete_many([_load_key(user_id) for user_id in user_ids])
+
+
+def _adjust_loads(deltas):
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            _cache().incr(_load_key(user_id), delta)
+        except ValueError:
+            # Not cached: the next read counts it from the database.
+            pass
+
+
+def track_workload(changes):
+    """
+    Move the cached open-issue counts by ``(before, after)`` issue snapshots,
+    as passed to ``record_issue_changes``, once the transaction commits.
+    """
+    deltas = defaultdict(int)
+    for before, after in changes:
+        for sign, snapshot in ((-1, before), (1, after)):
+            if snapshot and snapshot['assigned_to_id'] and snapshot['status'] in OPEN_STATUSES:
+                deltas[snapshot['assigned_to_id']] += sign
+    if any(deltas.values()):
+        transaction.on_commit(lambda: _adjust_loads(deltas))
+
+
+class Assigner:
+    """
+    Picks assignees for a batch of issues. Each candidate scores
+    ``ASSIGNMENT_AFFINITY_WEIGHT * affinity - open issues``, where affinity
+    sums the weights of their entries matching the issue's category and
+    location. Picks made through ``assign`` count towards the loads at once,
+    so a batch spreads out; the shared counters move through
+    ``track_workload`` when the issues are saved.
+    """
+
+    def __init__(self):
+        self.candidates = assignee_cache.get().rows
+        self.loads = open_loads([candidate['id'] for candidate in self.candidates])
+        self.deltas = defaultdict(int)
+
+    def choose(self, category_id, location_id, exclude=None, below=None):
+        """The best candidate other than ``exclude``; with ``below``, only those with fewer open issues."""
+        best, best_key = None, None
+        for candidate in self.candidates:
+            user_id = candidate['id']
+            load = self.load(user_id)
+            if user_id == exclude or (settings.ASSIGNMENT_MAX_OPEN and load >= settings.ASSIGNMENT_MAX_OPEN):
+                continue
+            if below is not None and load >= below:
+                continue
+            affinity = sum(
+                weight for category, location, weight in candidate['affinities']
+                if category in (None, category_id) and location in (None, location_id)
+            )
+            key = (settings.ASSIGNMENT_AFFINITY_WEIGHT * affinity - load, -load, -user_id)
+            if best_key is None or key > best_key:
+                best, best_key = user_id, key
+        return best
+
+    def assign(self, user_id, previous=None):
+        if previous:
+            self.deltas[previous] -= 1
+        if user_id:
+            self.deltas[user_id] += 1
+
+    def load(self, user_id):
+        return self.loads.get(user_id, 0) + self.deltas[user_id]
+
+
+def auto_assignee(category_id, location_id):
+    """The assignee for one new issue when ASSIGNMENT_MODE is 'auto', else None."""
+    if settings.ASSIGNMENT_MODE != 'auto':
+        return None
+    return Assigner().choose(category_id, location_id)
+
+
+def auto_assign(issues):
+    """Set ``assigned_to`` on new, unsaved ``issues`` when ASSIGNMENT_MODE is 'auto'."""
+    if settings.ASSIGNMENT_MODE != 'auto':
+        return
+    assigner = Assigner()
+    for issue in issues:
+        if issue.assigned_to_id is None:
+            issue.assigned_to_id = assigner.choose(issue.category_id, issue.location_id)
+            assigner.assign(issue.assigned_to_id)
+
+
+def _save_assignments(issues, previous):
+    """Write new assignees for ``issues`` and tell them; ``previous`` maps issue pk to its old snapshot."""
+    if not issues:
+        return
+    Issue.objects.bulk_update(issues, ['assigned_to', 'updated_at'])
+    track_workload([(previous[issue.pk], issue_snapshot(issue)) for issue in issues])
+    for issue in issues:
+        notify(NotificationChoices.ASSIGNMENT_CHANGED, issue, None)
+
+
+def assign_unassigned(batch_size=500):
+    """Assign every open, unassigned issue, oldest first. Returns how many were assigned."""
+    assigner = Assigner()
+    assigned = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Issue.objects.select_for_update()
+                .filter(pk__gt=last_pk, assigned_to__isnull=True, status__in=OPEN_STATUSES)
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return assigned
+            last_pk = batch[-1].pk
+            previous = {issue.pk: issue_snapshot(issue) for issue in batch}
+            changed = []
+            now = timezone.now()
+            for issue in batch:
+                user_id = assigner.choose(issue.category_id, issue.location_id)
+                if user_id is None:
+                    continue
+                issue.assigned_to_id, issue.updated_at = user_id, now
+                assigner.assign(user_id)
+                changed.append(issue)
+            _save_assignments(changed, previous)
+            assigned += len(changed)
+
+
+def rebalance(batch_size=500):
+    """
+    Move not-yet-started issues from assignees above the mean open load to
+    the best candidates still below it, newest issues first. Returns how many
+    issues moved.
+    """
+    assigner = Assigner()
+    staff = [candidate['id'] for candidate in assigner.candidates]
+    if not staff:
+        return 0
+    target = math.ceil(sum(assigner.load(user_id) for user_id in staff) / len(staff))
+    moved = 0
+    for user_id in staff:
+        excess = assigner.load(user_id) - target
+        while excess > 0:
+            with transaction.atomic():
+                batch = list(
+                    Issue.objects.select_for_update()
+                    .filter(assigned_to_id=user_id, status__in=MOVABLE_STATUSES)
+                    .order_by('-created_at', '-pk')[:min(excess, batch_size)]
+                )
+                previous = {issue.pk: issue_snapshot(issue) for issue in batch}
+                changed = []
+                now = timezone.now()
+                for issue in batch:
+                    new_user_id = assigner.choose(issue.category_id, issue.location_id, exclude=user_id, below=target)
+                    if new_user_id is None:
+                        continue
+                    issue.assigned_to_id, issue.updated_at = new_user_id, now
+                    assigner.assign(new_user_id, previous=user_id)
+                    changed.append(issue)
+                _save_assignments(changed, previous)
+            moved += len(changed)
+            if len(changed) < len(batch) or len(batch) < min(excess, batch_size):
+                break
+            excess -= len(changed)
+    return moved
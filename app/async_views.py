@@ -0,0 +1,154 @@
+"""
+Async counterparts of the hot read endpoints for deployments on the ASGI
+application. They fetch with the async ORM so a slow query parks a coroutine
+instead of a worker thread. Writes, search and custom ordering stay on the
+DRF viewsets.
+"""
+import base64
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponseNotModified, JsonResponse
+from .cache import reference_caches
+from .comments import build_comment_tree
+from .authentication import authenticate_jwt
+from .conditional import etag_matches, issue_etag
+from .filters import IssueFilter
+from .models import Comment, Issue
+from .serializers import CommentNodeSerializer, IssueDetailSerializer, IssueListSerializer
+from .views import issue_queryset
+
+
+def _unauthorized():
+    return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+
+def _not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+def _not_modified(request, etag):
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+async def _authenticate(request):
+    user = await sync_to_async(authenticate_jwt)(request)
+    if user is not None:
+        request.user = user
+    return user
+
+
+def _page_size(request):
+    default = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        return max(1, min(int(request.GET.get('page_size', default)), 100))
+    except ValueError:
+        return default
+
+
+def _encode_cursor(issue):
+    raw = f'{issue.created_at.isoformat()}|{issue.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+async def issue_list(request):
+    """Issues newest first, keyset-paginated on (created_at, id) without a count."""
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+    filterset = IssueFilter(request.GET, queryset=issue_queryset(user), request=request)
+    queryset = await sync_to_async(lambda: filterset.qs if filterset.is_valid() else None)()
+    if queryset is None:
+        return JsonResponse(filterset.errors, status=400)
+    if request.GET.get('cursor'):
+        try:
+            created_at, pk = _decode_cursor(request.GET['cursor'])
+        except ValueError:
+            return JsonResponse({'detail': 'Invalid cursor.'}, status=400)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    page_size = _page_size(request)
+    issues = [issue async for issue in queryset.order_by('-created_at', '-id')[:page_size + 1]]
+    next_url = None
+    if len(issues) > page_size:
+        issues = issues[:page_size]
+        query = request.GET.copy()
+        query['cursor'] = _encode_cursor(issues[-1])
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    etag = issue_etag(request, issues, next_url)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    data = await sync_to_async(
+        lambda: IssueListSerializer(issues, many=True, context={'request': request}).data
+    )()
+    response = JsonResponse({'next': next_url, 'results': data})
+    response['ETag'] = etag
+    return response
+
+
+async def issue_detail(request, pk):
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+    try:
+        issue = await issue_queryset(user).prefetch_related('images').aget(pk=pk)
+    except Issue.DoesNotExist:
+        return _not_found()
+    etag = issue_etag(request, [issue], *[f'{image.pk}:{image.status}' for image in issue.images.all()])
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    data = await sync_to_async(lambda: IssueDetailSerializer(issue, context={'request': request}).data)()
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    return response
+
+
+async def issue_comments(request, pk):
+    """Whole comment thread of an issue, as in IssueViewSet.comments."""
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+    if not await Issue.objects.filter(pk=pk).aexists():
+        return _not_found()
+    limit = settings.COMMENT_TREE_MAX_SIZE
+    comments = [
+        comment async for comment in
+        Comment.objects.filter(issue_id=pk).select_related('author').order_by('created_at', 'id')[:limit + 1]
+    ]
+    rows = CommentNodeSerializer(comments[:limit], many=True, context={'request': request}).data
+    return JsonResponse({
+        'results': build_comment_tree(rows, max_depth=settings.COMMENT_TREE_MAX_DEPTH,
+                                      flat=request.GET.get('shape') == 'flat'),
+        'truncated': len(comments) > limit,
+    })
+
+
+def _reference_list(name):
+    async def view(request):
+        user = await _authenticate(request)
+        if user is None:
+            return _unauthorized()
+        entry = await sync_to_async(reference_caches[name].get)()
+        not_modified = _not_modified(request, entry.etag)
+        if not_modified:
+            return not_modified
+        response = JsonResponse([row for row in entry.rows if row['is_active']], safe=False)
+        response['ETag'] = entry.etag
+        return response
+    view.__name__ = f'{name}_list'
+    return view
+
+
+category_list = _reference_list('category')
+location_list = _reference_list('location')
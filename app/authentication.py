@@ -0,0 +1,156 @@
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import AuthToken
+
+
+def _cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _device_key(user_id, device_id):
+    return f'auth:device:{user_id}:{device_id}'
+
+
+def parse_device_id(value):
+    """``value`` as a device UUID, or None if it is not one."""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def token_device_id(token):
+    """The ``device_id`` claim as a UUID, or None for tokens not bound to a device."""
+    return parse_device_id(token.get('device_id'))
+
+
+def is_device_revoked(user_id, device_id):
+    """Whether the user's device session was revoked; one cache read when warm."""
+    key = _device_key(user_id, device_id)
+    revoked = _cache().get(key)
+    if revoked is None:
+        revoked = AuthToken.objects.filter(user_id=user_id, device_id=device_id, status=False).exists()
+        _cache().set(key, revoked, None if revoked else settings.AUTH_CACHE_TIMEOUT)
+    return revoked
+
+
+def mark_device_revoked(user_id, device_id, revoked=True):
+    _cache().set(_device_key(user_id, device_id), revoked, None if revoked else settings.AUTH_CACHE_TIMEOUT)
+
+
+def invalidate_cached_user(user_id):
+    _cache().delete(_user_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that rejects tokens from revoked devices and serves the
+    user from a short-lived cache, so a warm request runs no queries.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(settings.SIMPLE_JWT['USER_ID_CLAIM'])
+        device_id = token_device_id(validated_token)
+        if user_id is None:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if device_id is not None and is_device_revoked(user_id, device_id):
+            raise AuthenticationFailed('Device has been revoked', code='device_revoked')
+
+        user = _cache().get(_user_key(user_id))
+        if user is None:
+            user = super().get_user(validated_token)
+            _cache().set(_user_key(user_id), user, settings.AUTH_CACHE_TIMEOUT)
+        return user
+
+
+def issue_device_tokens(user, device_id):
+    """
+    Mint a token pair bound to ``device_id`` and upsert the refresh token's
+    ``jti`` onto the device's AuthToken in a single statement. Only the recorded
+    refresh token can be exchanged, so no blacklist rows are needed. Raises
+    ValueError if ``device_id`` is not a UUID: every token is device-bound.
+    """
+    device_id = uuid.UUID(str(device_id))
+    refresh = RefreshToken.for_user(user)
+    refresh['device_id'] = str(device_id)
+    refresh['username'] = user.username
+    refresh['role'] = user.role
+    AuthToken.objects.bulk_create(
+        [AuthToken(user=user, device_id=device_id, key=refresh['jti'], status=True)],
+        update_conflicts=True,
+        unique_fields=['user', 'device_id'],
+        update_fields=['key', 'status', 'last_login', 'updated_at'],
+    )
+    mark_device_revoked(user.pk, device_id, False)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Exchange a refresh token for a new access token, plus a new refresh token
+    when rotation is on. A device-bound token is accepted only while it is the
+    device's current one; the check and the rotation are one conditional UPDATE.
+    """
+    refresh = RefreshToken(raw_token)
+    user = CachedJWTAuthentication().get_user(refresh)
+    jti = refresh['jti']
+    data = {'access': str(refresh.access_token)}
+    if settings.SIMPLE_JWT['ROTATE_REFRESH_TOKENS']:
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+
+    device_id = token_device_id(refresh)
+    if device_id is not None:
+        now = timezone.now()
+        rotated = AuthToken.objects.filter(user_id=user.pk, device_id=device_id, key=jti, status=True).update(
+            key=refresh['jti'], last_login=now, updated_at=now,
+        )
+        if not rotated:
+            raise TokenError('Token is invalid or has already been used')
+    return data
+
+
+def compact_auth_tokens(batch_size=1000):
+    """
+    Delete device sessions whose tokens have all expired. Returns the number
+    of rows removed.
+    """
+    lifetime = max(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'], settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'])
+    ids = list(
+        AuthToken.objects.filter(last_login__lt=timezone.now() - lifetime)
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    return AuthToken.objects.filter(pk__in=ids).delete()[0]
+
+
+def authenticate_jwt(request):
+    """
+    Resolve the user for plain Django views (streams, async reads) from the
+    Bearer header, or from ``?token=`` since EventSource cannot set headers.
+    """
+    authentication = CachedJWTAuthentication()
+    try:
+        result = authentication.authenticate(request)
+        if result is None and request.GET.get('token'):
+            token = authentication.get_validated_token(request.GET['token'])
+            result = authentication.get_user(token), token
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return result[0] if result else None
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ReferenceCache:
+    """
+    Read-through cache for small, rarely changing tables.
+
+    Serialized rows are stored in the shared cache under a version token and
+    mirrored in process memory, so a warm lookup costs one shared-cache read
+    (to check the version) and no database queries. ``invalidate`` rotates
+    the version, which every process picks up on its next lookup. The version
+    itself expires after REFERENCE_CACHE_VERSION_TIMEOUT, so a process whose
+    cache is not shared (LocMemCache) serves stale rows for at most that long.
+    The version is only an invalidation token: ETags hash the rows, so they
+    stay put across expiry and agree between processes.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._local = None
+
+    @property
+    def cache(self):
+        return caches[settings.REFERENCE_CACHE_ALIAS]
+
+    @property
+    def version_key(self):
+        return f'refdata:{self.name}:version'
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, uuid.uuid4().hex, settings.REFERENCE_CACHE_VERSION_TIMEOUT)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def get(self):
+        version = self.version()
+        local = self._local
+        if local is not None and local.version == version:
+            return local
+        data_key = f'refdata:{self.name}:{version}'
+        rows = self.cache.get(data_key)
+        if rows is None:
+            rows = self.loader()
+            self.cache.set(data_key, rows, settings.REFERENCE_CACHE_TIMEOUT)
+        self._local = ReferenceEntry(version, rows)
+        return self._local
+
+    def invalidate(self):
+        self.cache.set(self.version_key, uuid.uuid4().hex, settings.REFERENCE_CACHE_VERSION_TIMEOUT)
+        self._local = None
+
+
+class ReferenceEntry:
+    def __init__(self, version, rows):
+        self.version = version
+        self.rows = rows
+        self.by_id = {row['id']: row for row in rows}
+        digest = hashlib.blake2b(json.dumps(rows, sort_keys=True, default=str).encode(), digest_size=16)
+        self.etag = f'"{digest.hexdigest()}"'
+
+
+def _load_categories():
+    from .models import Category
+    from .serializers import CategorySerializer
+    return [dict(row) for row in CategorySerializer(Category.objects.order_by('pk'), many=True).data]
+
+
+def _load_locations():
+    from .models import Location
+    from .serializers import LocationSerializer
+    return [dict(row) for row in LocationSerializer(Location.objects.order_by('pk'), many=True).data]
+
+
+reference_caches = {
+    'category': ReferenceCache('category', _load_categories),
+    'location': ReferenceCache('location', _load_locations),
+}
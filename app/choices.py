@@ -29,6 +29,14 @@ class PriorityChoices(models.TextChoices):
     CRITICAL = 'critical', 'Critical'
 
 
+PRIORITY_SEVERITY = {
+    PriorityChoices.LOW: 0,
+    PriorityChoices.MEDIUM: 1,
+    PriorityChoices.HIGH: 2,
+    PriorityChoices.CRITICAL: 3,
+}
+
+
 class StatusChoices(models.TextChoices):
     REPORTED = 'reported', 'Reported'
     ACKNOWLEDGED = 'acknowledged', 'Acknowledged'
@@ -38,9 +46,27 @@ class StatusChoices(models.TextChoices):
     REJECTED = 'rejected', 'Rejected'
 
 
+OPEN_STATUSES = [StatusChoices.REPORTED, StatusChoices.ACKNOWLEDGED, StatusChoices.IN_PROGRESS]
+
+
 class NotificationChoices(models.TextChoices):
     ISSUE_CREATED = 'issue_created', 'Issue Created'
     ISSUE_UPDATED = 'issue_updated', 'Issue Updated'
     COMMENT_ADDED = 'comment_added', 'Comment Added'
     UPVOTE_RECEIVED = 'upvote_received', 'Upvote Received'
     ASSIGNMENT_CHANGED = 'assignment_changed', 'Assignment Changed'
+    SLA_WARNING = 'sla_warning', 'SLA Warning'
+    SLA_BREACHED = 'sla_breached', 'SLA Breached'
+
+
+class SLAStageChoices(models.IntegerChoices):
+    ON_TRACK = 0, 'On Track'
+    WARNED = 1, 'Warned'
+    BREACHED = 2, 'Breached'
+
+
+class ImageStatusChoices(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    PROCESSING = 'processing', 'Processing'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
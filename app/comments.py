@@ -0,0 +1,64 @@
+from django.conf import settings
+from .models import Comment
+from .serializers import CommentNodeSerializer
+
+
+def build_comment_tree(rows, max_depth=None, flat=False):
+    """
+    Assemble serialized comments into threads without recursion.
+
+    ``rows`` must be ordered so parents come before their replies (created_at
+    order does this). Replies nested deeper than ``max_depth`` are dropped
+    together with their descendants. With ``flat=True`` the surviving rows
+    are returned as a parent-id-linked list annotated with their depth.
+    """
+    nodes = {}
+    roots = []
+    for row in rows:
+        parent_id = row['parent']
+        if parent_id is None:
+            depth = 0
+        elif parent_id in nodes:
+            depth = nodes[parent_id]['depth'] + 1
+        else:
+            continue
+        if max_depth is not None and depth > max_depth:
+            continue
+        row['depth'] = depth
+        if not flat:
+            row['replies'] = []
+        if flat or parent_id is None:
+            roots.append(row)
+        else:
+            nodes[parent_id]['replies'].append(row)
+        nodes[row['id']] = row
+    return roots
+
+
+def reply_trees(comments, context=None):
+    """
+    The nested replies of each of ``comments``, as ``{comment_id: [reply, ...]}``.
+    Only their descendants are loaded, one query per level, down to
+    COMMENT_TREE_MAX_DEPTH levels and COMMENT_TREE_MAX_SIZE replies in all.
+    """
+    trees = {comment.pk: [] for comment in comments}
+    parent_ids = list(trees)
+    budget = settings.COMMENT_TREE_MAX_SIZE
+    for _ in range(settings.COMMENT_TREE_MAX_DEPTH):
+        if not parent_ids or budget <= 0:
+            break
+        replies = list(
+            Comment.objects.filter(parent_id__in=parent_ids)
+            .select_related('author').order_by('created_at', 'id')[:budget]
+        )
+        budget -= len(replies)
+        parent_ids = []
+        for row in CommentNodeSerializer(replies, many=True, context=context).data:
+            trees[row['parent']].append(row)
+            if row['id'] in trees:
+                # Also one of ``comments``: its replies are already being loaded.
+                row['replies'] = trees[row['id']]
+                continue
+            row['replies'] = trees[row['id']] = []
+            parent_ids.append(row['id'])
+    return trees
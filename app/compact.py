@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db.models.functions import Left
+from .cache import reference_caches
+from .models import User
+from .serializers import UserSerializer
+
+COMPACT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'reporter': 'reporter_id',
+    'category': 'category_id',
+    'location': 'location_id',
+    'priority': 'priority',
+    'status': 'status',
+    'upvotes_count': 'upvotes_count',
+    'comments_count': 'comments_count',
+    'created_at': 'created_at',
+}
+# Read alongside the output fields: cursor positions, ETag inputs, annotations.
+ROW_EXTRAS = ('severity', 'updated_at', 'reporter__updated_at', 'assigned_to__updated_at')
+USER_FIELDS = tuple(UserSerializer.Meta.fields)
+
+
+def compact_issue_rows(queryset):
+    """``.values()`` rows for the compact feed, with the description cut short in SQL."""
+    limit = settings.COMPACT_DESCRIPTION_LENGTH
+    annotations = [name for name in ('is_upvoted', 'search_rank') if name in queryset.query.annotations]
+    return queryset.annotate(description_start=Left('description', limit + 1)).values(
+        *COMPACT_FIELDS.values(), *ROW_EXTRAS, *annotations, 'description_start',
+    )
+
+
+def _included_users(user_ids, request):
+    users = {}
+    for row in User.objects.filter(pk__in=user_ids).values(*USER_FIELDS):
+        picture = row['profile_picture']
+        if picture:
+            url = User._meta.get_field('profile_picture').storage.url(picture)
+            row['profile_picture'] = request.build_absolute_uri(url) if request else url
+        else:
+            row['profile_picture'] = None
+        users[row['id']] = row
+    return users
+
+
+def compact_page(rows, request):
+    """
+    The compact representation of a page: issue rows that reference their
+    reporter, category and location by id, and an ``included`` map holding
+    each referenced object once.
+    """
+    limit = settings.COMPACT_DESCRIPTION_LENGTH
+    results = []
+    for row in rows:
+        description = row['description_start']
+        item = {name: row[source] for name, source in COMPACT_FIELDS.items()}
+        item['description'] = description if len(description) <= limit else description[:limit].rstrip() + '…'
+        item['is_upvoted'] = row.get('is_upvoted', False)
+        results.append(item)
+    categories = reference_caches['category'].get().by_id
+    locations = reference_caches['location'].get().by_id
+    included = {
+        'users': _included_users({item['reporter'] for item in results}, request),
+        'categories': {pk: categories.get(pk) for pk in {item['category'] for item in results}},
+        'locations': {pk: locations.get(pk) for pk in {item['location'] for item in results}},
+    }
+    return results, included
@@ -0,0 +1,48 @@
+import hashlib
+from rest_framework import status
+from rest_framework.response import Response
+from .cache import reference_caches
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match', '')
+    return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def _issue_fields(issue):
+    if isinstance(issue, dict):
+        return (
+            issue['id'], issue['updated_at'], issue['status'], issue['upvotes_count'], issue['comments_count'],
+            issue.get('is_upvoted', ''), [issue['reporter__updated_at'], issue['assigned_to__updated_at']],
+        )
+    return (
+        issue.pk, issue.updated_at, issue.status, issue.upvotes_count, issue.comments_count,
+        getattr(issue, 'is_upvoted', ''), [user.updated_at for user in (issue.reporter, issue.assigned_to) if user],
+    )
+
+
+def issue_etag(request, issues, *extra):
+    """
+    Cheap validator for issue payloads, built from the already loaded rows
+    (model instances or compact ``.values()`` rows) so a match can be
+    answered before any serializer runs. Counters are included because they
+    are updated without touching ``updated_at``.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{request.user.pk};'.encode())
+    for name in ('category', 'location'):
+        digest.update(f'{reference_caches[name].get().etag};'.encode())
+    for issue in issues:
+        pk, updated_at, state, upvotes, comments, is_upvoted, people = _issue_fields(issue)
+        people = [updated.isoformat() for updated in people if updated]
+        digest.update(
+            f'{pk}:{updated_at.isoformat()}:{state}:{upvotes}:'
+            f'{comments}:{is_upvoted}:{",".join(people)};'.encode()
+        )
+    for item in extra:
+        digest.update(f'{item};'.encode())
+    return f'"{digest.hexdigest()}"'
@@ -0,0 +1,69 @@
+import random
+from collections import defaultdict
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from .models import Comment, Issue, Upvote, UpvoteCounterShard
+
+
+def apply_comment_delta(issue_id, delta):
+    Issue.objects.filter(pk=issue_id).update(comments_count=Greatest(F('comments_count') + delta, 0))
+
+
+def apply_upvote_delta(issue_id, delta):
+    shards = getattr(settings, 'UPVOTE_COUNTER_SHARDS', 0)
+    if not shards:
+        Issue.objects.filter(pk=issue_id).update(upvotes_count=Greatest(F('upvotes_count') + delta, 0))
+        return
+    shard = random.randrange(shards)
+    if UpvoteCounterShard.objects.filter(issue_id=issue_id, shard=shard).update(delta=F('delta') + delta):
+        return
+    try:
+        with transaction.atomic():
+            UpvoteCounterShard.objects.create(issue_id=issue_id, shard=shard, delta=delta)
+    except IntegrityError:
+        UpvoteCounterShard.objects.filter(issue_id=issue_id, shard=shard).update(delta=F('delta') + delta)
+
+
+def flush_upvote_shards(batch_size=500):
+    """Fold pending shard deltas into Issue.upvotes_count. Returns the number of issues touched."""
+    with transaction.atomic():
+        rows = list(
+            UpvoteCounterShard.objects.select_for_update()
+            .exclude(delta=0)
+            .values_list('pk', 'issue_id', 'delta')[:batch_size]
+        )
+        totals = defaultdict(int)
+        for _, issue_id, delta in rows:
+            totals[issue_id] += delta
+        for issue_id, delta in totals.items():
+            if delta:
+                Issue.objects.filter(pk=issue_id).update(upvotes_count=Greatest(F('upvotes_count') + delta, 0))
+        UpvoteCounterShard.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(delta=0)
+    return len(totals)
+
+
+def _per_issue(queryset, aggregate):
+    return Coalesce(
+        Subquery(queryset.filter(issue=OuterRef('pk')).order_by().values('issue').annotate(total=aggregate).values('total')),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def reconcile_counters(first_pk, last_pk):
+    """
+    Recount comments_count and upvotes_count for issues with ``first_pk <= pk
+    <= last_pk`` and fix the ones that drifted, in one UPDATE. Upvotes still
+    buffered in counter shards are left for ``flush_upvote_shards`` to add.
+    Returns the number of issues corrected.
+    """
+    comments = _per_issue(Comment.objects.all(), Count('pk'))
+    upvotes = _per_issue(Upvote.objects.all(), Count('pk')) - _per_issue(UpvoteCounterShard.objects.all(), Sum('delta'))
+    return (
+        Issue.objects.filter(pk__gte=first_pk, pk__lte=last_pk)
+        .annotate(actual_comments=comments, actual_upvotes=Greatest(upvotes, Value(0)))
+        .filter(~Q(comments_count=F('actual_comments')) | ~Q(upvotes_count=F('actual_upvotes')))
+        .update(comments_count=comments, upvotes_count=Greatest(upvotes, Value(0)))
+    )
@@ -0,0 +1,128 @@
+import hashlib
+import re
+from django.conf import settings
+from django.db.models import Q
+from PIL import Image
+from .choices import OPEN_STATUSES
+from .images import image_phash, similar_images
+from .models import Issue, IssueTextBand
+
+MINHASH_BANDS = 16
+MINHASH_ROWS = 2
+MINHASH_SIZE = MINHASH_BANDS * MINHASH_ROWS
+SHINGLE_SIZE = 4
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f'a{i}'.encode(), digest_size=8).digest(), 'big') % (_PRIME - 1) + 1,
+        int.from_bytes(hashlib.blake2b(f'b{i}'.encode(), digest_size=8).digest(), 'big') % _PRIME,
+    )
+    for i in range(MINHASH_SIZE)
+]
+
+
+def _stable_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def shingles(text):
+    words = ' '.join(re.findall(r'\w+', text.lower()))
+    if len(words) <= SHINGLE_SIZE:
+        return {words} if words else set()
+    return {words[i:i + SHINGLE_SIZE] for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    hashed = [_stable_hash(shingle) for shingle in shingles(text)]
+    if not hashed:
+        return []
+    return [min((a * value + b) % _PRIME for value in hashed) for a, b in _PERMUTATIONS]
+
+
+def signature_bands(signature):
+    return [
+        int.from_bytes(
+            hashlib.blake2b(repr(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]).encode(), digest_size=8).digest(),
+            'big', signed=True,
+        )
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def issue_text(issue):
+    return f'{issue.title} {issue.description}'
+
+
+def index_issues(issues):
+    """(Re)build the MinHash signature and LSH band rows for ``issues``."""
+    issues = list(issues)
+    bands = []
+    for issue in issues:
+        issue.minhash = minhash(issue_text(issue))
+        if issue.minhash:
+            bands.extend(
+                IssueTextBand(issue=issue, band=band, value=value)
+                for band, value in enumerate(signature_bands(issue.minhash))
+            )
+    IssueTextBand.objects.filter(issue__in=issues).delete()
+    IssueTextBand.objects.bulk_create(bands)
+    Issue.objects.bulk_update(issues, ['minhash'])
+
+
+def upload_phashes(files):
+    """dHash uploaded photos before they are stored; JPEGs decode at reduced scale."""
+    phashes = []
+    for upload in files:
+        try:
+            upload.seek(0)
+            with Image.open(upload) as img:
+                img.draft('L', (64, 64))
+                phashes.append(image_phash(img))
+        except Exception:
+            continue
+        finally:
+            upload.seek(0)
+    return phashes
+
+
+def find_duplicates(issue, phashes=None, limit=None):
+    """
+    Open issues at the same location that probably report the same fault as
+    ``issue``, as ``[(issue_id, score)]``. Text candidates come from the
+    MinHash LSH bands and image candidates from the dHash bands, so neither
+    side scans the issue table. The two similarities are combined as
+    ``1 - (1 - text) * (1 - image)``.
+    """
+    limit = limit or settings.DUPLICATE_MAX_RESULTS
+    open_issues = Issue.objects.filter(
+        location_id=issue.location_id, status__in=OPEN_STATUSES
+    ).exclude(pk=issue.pk)
+
+    text_scores = {}
+    signature = issue.minhash or minhash(issue_text(issue))
+    if signature:
+        match = Q()
+        for band, value in enumerate(signature_bands(signature)):
+            match |= Q(band=band, value=value)
+        candidates = (
+            IssueTextBand.objects.filter(match, issue__in=open_issues)
+            .values_list('issue_id', 'issue__minhash')
+        )
+        for issue_id, other in candidates:
+            if other:
+                text_scores[issue_id] = sum(x == y for x, y in zip(signature, other)) / MINHASH_SIZE
+
+    if phashes is None:
+        phashes = [phash for phash in issue.images.values_list('phash', flat=True) if phash]
+    image_scores = {}
+    for phash in phashes:
+        for _, issue_id, distance in similar_images(phash, issues=open_issues):
+            score = 1 - distance / 64
+            image_scores[issue_id] = max(score, image_scores.get(issue_id, 0))
+
+    scores = {}
+    for issue_id in text_scores.keys() | image_scores.keys():
+        score = 1 - (1 - text_scores.get(issue_id, 0)) * (1 - image_scores.get(issue_id, 0))
+        if score >= settings.DUPLICATE_MIN_SCORE:
+            scores[issue_id] = score
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
@@ -0,0 +1,108 @@
+import csv
+import json
+import zlib
+from collections import defaultdict
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import IssueStatusHistory
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'status': 'status',
+    'priority': 'priority',
+    'reporter': 'reporter__username',
+    'assigned_to': 'assigned_to__username',
+    'location': 'location__name',
+    'category': 'category__name',
+    'upvotes_count': 'upvotes_count',
+    'comments_count': 'comments_count',
+    'is_anonymous': 'is_anonymous',
+    'estimated_resolution_time': 'estimated_resolution_time',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'resolved_at': 'resolved_at',
+}
+HISTORY_COLUMNS = ('issue_id', 'old_status', 'new_status', 'changed_by__username', 'comment', 'created_at')
+# Spreadsheets run cells starting with these as formulas; CSV cells get a leading quote.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _chunks(issues, chunk_size):
+    chunk = []
+    rows = issues.order_by('pk').values_list(*EXPORT_COLUMNS.values()).iterator(chunk_size=chunk_size)
+    for row in rows:
+        chunk.append(dict(zip(EXPORT_COLUMNS, row)))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _with_history(chunk):
+    history = defaultdict(list)
+    rows = (
+        IssueStatusHistory.objects.filter(issue_id__in=[row['id'] for row in chunk])
+        .order_by('issue_id', 'created_at', 'pk')
+        .values_list(*HISTORY_COLUMNS)
+    )
+    for issue_id, old_status, new_status, changed_by, comment, created_at in rows:
+        history[issue_id].append({
+            'old_status': old_status,
+            'new_status': new_status,
+            'changed_by': changed_by,
+            'comment': comment,
+            'created_at': created_at,
+        })
+    for row in chunk:
+        row['status_history'] = history.get(row['id'], [])
+    return chunk
+
+
+class _Line:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value, encoder):
+    if isinstance(value, str):
+        return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return encoder.default(value)
+
+
+def export_issues(issues, file_format='csv', chunk_size=2000):
+    """
+    Yield ``issues`` with their status history as CSV or JSON Lines text.
+    Rows come off a server-side cursor ``chunk_size`` at a time and history is
+    fetched per chunk, so memory stays flat however many issues there are.
+    """
+    encoder = DjangoJSONEncoder()
+    if file_format == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow([*EXPORT_COLUMNS, 'status_history'])
+    for chunk in _chunks(issues, chunk_size):
+        lines = []
+        for row in _with_history(chunk):
+            if file_format == 'csv':
+                row['status_history'] = json.dumps(row['status_history'], cls=DjangoJSONEncoder)
+                lines.append(writer.writerow([_csv_value(value, encoder) for value in row.values()]))
+            else:
+                lines.append(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+        yield ''.join(lines)
+
+
+def gzip_stream(chunks):
+    """Gzip an iterable of text chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
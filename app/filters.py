@@ -0,0 +1,70 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+from .models import Issue
+from .search import SEARCH_CONFIG, search_enabled
+
+
+def _search_terms(request):
+    return request.query_params.get(filters.SearchFilter.search_param, '').strip()
+
+
+class IssueSearchFilter(filters.SearchFilter):
+    """
+    Full-text search over the weighted Issue.search_vector column. Falls back
+    to DRF's ILIKE search on databases other than PostgreSQL.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = _search_terms(request)
+        if not terms or not search_enabled():
+            return super().filter_queryset(request, queryset, view)
+        query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+        if request.query_params.get('highlight', '').lower() in ('1', 'true', 'yes'):
+            queryset = queryset.annotate(
+                search_headline=SearchHeadline('description', query, config=SEARCH_CONFIG, max_words=35, min_words=15)
+            )
+        return queryset
+
+
+class IssueOrderingFilter(filters.OrderingFilter):
+    """
+    Orders full-text search results by rank unless the client asks otherwise.
+    ``priority`` sorts by the numeric severity column, and ``?ordering=triage``
+    gives critical first, then most upvoted, then oldest.
+    """
+    triage_ordering = ['-severity', '-upvotes_count', 'created_at', 'id']
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param, '').strip() == 'triage':
+            return list(self.triage_ordering)
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [term.replace('priority', 'severity') for term in ordering]
+
+    def _ranked(self, request):
+        return bool(_search_terms(request)) and search_enabled()
+
+    def get_default_ordering(self, view):
+        if self._ranked(view.request):
+            return ['-search_rank', '-id']
+        return super().get_default_ordering(view)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = super().remove_invalid_fields(queryset, fields, view, request)
+        if not self._ranked(request):
+            fields = [term for term in fields if term.lstrip('-') != 'search_rank']
+        return fields
+
+
+class IssueFilter(django_filters.FilterSet):
+    created_at = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Issue
+        fields = ['status', 'priority', 'category', 'location', 'assigned_to', 'reporter', 'is_anonymous', 'created_at']
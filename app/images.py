@@ -0,0 +1,199 @@
+import hashlib
+import io
+import logging
+import os
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+from .choices import ImageStatusChoices
+from .models import IssueImage, PerceptualHashBand
+from .workers import submit_after_commit
+
+logger = logging.getLogger(__name__)
+
+# Formats an original is re-encoded in after its metadata is stripped, with their extensions.
+ORIGINAL_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def _rendition_format():
+    image_format = settings.IMAGE_RENDITION_FORMAT.upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def _render(img, size, image_format):
+    rendition = img.copy()
+    rendition.thumbnail(size, Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and rendition.mode not in ('RGB', 'L'):
+        rendition = rendition.convert('RGB')
+    buffer = io.BytesIO()
+    rendition.save(buffer, format=image_format, quality=82, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def claim_image(image_id):
+    return IssueImage.objects.filter(pk=image_id, status=ImageStatusChoices.PENDING).update(
+        status=ImageStatusChoices.PROCESSING,
+        attempts=F('attempts') + 1,
+        claimed_at=timezone.now(),
+    )
+
+
+def dhash(img, size=8):
+    """64-bit difference hash: robust to re-encoding, resizing and small edits."""
+    gray = img.convert('L').resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return bits
+
+
+def image_phash(img):
+    """
+    The stored dHash of a photo, as hex, taken the right way up. Both the
+    upload-time duplicate check and image processing hash through here, so
+    the two always agree.
+    """
+    return f'{dhash(ImageOps.exif_transpose(img)):016x}'
+
+
+def hash_bands(bits):
+    return [(bits >> (16 * band)) & 0xFFFF for band in range(4)]
+
+
+def similar_images(phash, max_distance=None, issues=None):
+    """
+    Images whose dHash is within ``max_distance`` bits of ``phash``, as
+    ``[(image_id, issue_id, distance)]``. Candidates come from the indexed
+    16-bit bands, so every image within 3 bits is found without a scan.
+    """
+    if max_distance is None:
+        max_distance = settings.PHASH_MAX_DISTANCE
+    bits = int(phash, 16)
+    match = Q()
+    for band, value in enumerate(hash_bands(bits)):
+        match |= Q(band=band, value=value)
+    candidates = PerceptualHashBand.objects.filter(match)
+    if issues is not None:
+        candidates = candidates.filter(image__issue__in=issues)
+    results = []
+    for image_id, issue_id, other in candidates.values_list('image_id', 'image__issue_id', 'image__phash').distinct():
+        distance = (bits ^ int(other, 16)).bit_count()
+        if distance <= max_distance:
+            results.append((image_id, issue_id, distance))
+    return sorted(results, key=lambda result: result[2])
+
+
+def _strip_original(img, source_format):
+    """Re-encode the upright original without EXIF or other metadata, so GPS tags are not kept."""
+    image_format = source_format if source_format in ORIGINAL_FORMATS else 'PNG'
+    if image_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, quality=95, icc_profile=img.info.get('icc_profile'))
+    return ContentFile(buffer.getvalue()), ORIGINAL_FORMATS.get(image_format, 'png')
+
+
+def _copy_processed(image, twin):
+    image.width, image.height, image.phash = twin.width, twin.height, twin.phash
+    for name in ('image', *settings.IMAGE_RENDITIONS):
+        rendition = getattr(twin, name)
+        if rendition:
+            rendition.storage.retain(rendition.name)
+        setattr(image, name, rendition.name)
+
+
+def process_issue_image(image_id):
+    """
+    Decode an uploaded issue photo, record its size, SHA-256 and dHash, and
+    write EXIF-free thumbnail/medium renditions. The original is replaced by
+    an EXIF-free re-encode as well. Byte-identical uploads reuse the files of
+    an already processed copy. Returns False if another worker already
+    claimed the image.
+    """
+    if not claim_image(image_id):
+        return False
+    image = IssueImage.objects.get(pk=image_id)
+    image_format = _rendition_format()
+    extension = 'jpg' if image_format == 'JPEG' else image_format.lower()
+    stem = os.path.splitext(os.path.basename(image.image.name))[0]
+    original_name = image.image.name
+    try:
+        digest = hashlib.sha256()
+        with image.image.open('rb') as fh:
+            for chunk in iter(lambda: fh.read(64 * 1024), b''):
+                digest.update(chunk)
+            image.sha256 = digest.hexdigest()
+            twin = (
+                IssueImage.objects.filter(sha256=image.sha256, status=ImageStatusChoices.READY)
+                .exclude(pk=image.pk).exclude(phash='').first()
+            )
+            if twin is not None:
+                _copy_processed(image, twin)
+            else:
+                fh.seek(0)
+                with Image.open(fh) as img:
+                    source_format = img.format
+                    img = ImageOps.exif_transpose(img)
+                    image.width, image.height = img.size
+                    image.phash = image_phash(img)
+                    for name, size in settings.IMAGE_RENDITIONS.items():
+                        getattr(image, name).save(f'{stem}.{extension}', _render(img, size, image_format), save=False)
+                    stripped, original_extension = _strip_original(img, source_format)
+        if twin is None:
+            image.image.save(f'{stem}.{original_extension}', stripped, save=False)
+    except Exception:
+        logger.exception("Failed to process issue image %s", image_id)
+        IssueImage.objects.filter(pk=image_id).update(status=ImageStatusChoices.FAILED)
+        return True
+    image.status = ImageStatusChoices.READY
+    image.processed_at = timezone.now()
+    with transaction.atomic():
+        image.save(update_fields=[
+            'image', 'width', 'height', 'sha256', 'phash', 'status', 'processed_at', *settings.IMAGE_RENDITIONS,
+        ])
+        if image.image.name != original_name:
+            transaction.on_commit(lambda: image.image.storage.delete(original_name))
+        PerceptualHashBand.objects.filter(image=image).delete()
+        PerceptualHashBand.objects.bulk_create([
+            PerceptualHashBand(image=image, band=band, value=value)
+            for band, value in enumerate(hash_bands(int(image.phash, 16)))
+        ])
+    return True
+
+
+def requeue_images():
+    """Put failed images with attempts left, and stale claims, back in the queue."""
+    stale = timezone.now() - settings.IMAGE_PIPELINE_CLAIM_TIMEOUT
+    return IssueImage.objects.filter(
+        Q(status=ImageStatusChoices.FAILED, attempts__lt=settings.IMAGE_PIPELINE_MAX_ATTEMPTS)
+        | Q(status=ImageStatusChoices.PROCESSING, claimed_at__lt=stale)
+    ).update(status=ImageStatusChoices.PENDING)
+
+
+def pending_image_ids(limit):
+    return list(
+        IssueImage.objects.filter(status=ImageStatusChoices.PENDING)
+        .order_by('uploaded_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def process_image_job(image_id):
+    try:
+        return process_issue_image(image_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue_image(image_id):
+    """Hand a freshly saved image to the in-process pool once the upload commits."""
+    if settings.IMAGE_PIPELINE_INLINE_WORKERS:
+        submit_after_commit('issue-images', settings.IMAGE_PIPELINE_INLINE_WORKERS, process_issue_image, image_id)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from app.assignment import assign_unassigned, rebalance
+
+
+class Command(BaseCommand):
+    help = "Assign open, unassigned issues to maintenance staff by affinity and open workload"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--rebalance', action='store_true',
+                            help="Also move reported/acknowledged issues off staff above the mean open load")
+
+    def handle(self, *args, **options):
+        assigned = assign_unassigned(options['batch_size'])
+        self.stdout.write(f"Assigned {assigned} issues")
+        if options['rebalance']:
+            moved = rebalance(options['batch_size'])
+            self.stdout.write(f"Moved {moved} issues while rebalancing")
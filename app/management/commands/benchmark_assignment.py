@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from app.assignment import Assigner, assignee_cache, forget_loads
+from app.choices import OPEN_STATUSES, RoleChoices
+from app.models import AssignmentAffinity, Category, Issue, Location, User
+
+
+class Command(BaseCommand):
+    help = "Measure auto-assignment latency against many staff and open issues; all data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=300)
+        parser.add_argument('--open-issues', type=int, default=5000)
+        parser.add_argument('--assignments', type=int, default=1000)
+        parser.add_argument('--baseline', type=int, default=20,
+                            help="Assignments to time with a COUNT query per candidate, for comparison")
+
+    def handle(self, *args, **options):
+        staff = []
+        try:
+            with transaction.atomic():
+                staff, categories, locations = self._seed(options)
+                self._run(staff, categories, locations, options)
+                transaction.set_rollback(True)
+        finally:
+            forget_loads(staff)
+            assignee_cache.invalidate()
+
+    def _seed(self, options):
+        suffix = uuid.uuid4().hex[:8]
+        reporter = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        categories = [Category.objects.create(name=f'bench-{suffix}-{n}') for n in range(10)]
+        locations = [Location.objects.create(name=f'Bench {n}', location_type='building') for n in range(20)]
+        users = User.objects.bulk_create([
+            User(username=f'bench-{suffix}-staff-{n}', email=f'bench-{suffix}-staff-{n}@example.com',
+                 role=RoleChoices.MAINTENANCE, password='!')
+            for n in range(options['staff'])
+        ])
+        staff = [user.pk for user in users]
+        AssignmentAffinity.objects.bulk_create([
+            AssignmentAffinity(user_id=user_id, category=categories[n % len(categories)],
+                               location=locations[n % len(locations)] if n % 3 == 0 else None)
+            for n, user_id in enumerate(staff)
+        ])
+        rng = random.Random(0)
+        Issue.objects.bulk_create([
+            Issue(title=f'Benchmark issue {n}', description='Benchmark', reporter=reporter,
+                  category=rng.choice(categories), location=rng.choice(locations),
+                  status=rng.choice(OPEN_STATUSES), assigned_to_id=rng.choice(staff))
+            for n in range(options['open_issues'])
+        ], batch_size=2000)
+        assignee_cache.invalidate()
+        forget_loads(staff)
+        return staff, categories, locations
+
+    def _time(self, count, call):
+        rng = random.Random(1)
+        samples = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(count):
+                category, location = rng.choice(self.categories).pk, rng.choice(self.locations).pk
+                started = time.perf_counter()
+                call(category, location)
+                samples.append((time.perf_counter() - started) * 1000)
+        return samples, len(queries.captured_queries) / count
+
+    def _count_per_candidate(self, category, location):
+        candidates = assignee_cache.get().rows
+        loads = {
+            candidate['id']: Issue.objects.filter(assigned_to_id=candidate['id'], status__in=OPEN_STATUSES).count()
+            for candidate in candidates
+        }
+        return min(loads, key=loads.get)
+
+    def _run(self, staff, categories, locations, options):
+        self.categories, self.locations = categories, locations
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            Assigner()
+            cold = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"Cold start: {cold:.1f} ms, {len(queries.captured_queries)} queries")
+        self.stdout.write(f"{'strategy':>20} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8}")
+        runs = [('cached counters', options['assignments'], lambda c, l: Assigner().choose(c, l))]
+        if options['baseline']:
+            runs.append(('COUNT per candidate', options['baseline'], self._count_per_candidate))
+        for name, count, call in runs:
+            samples, per_call = self._time(count, call)
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            self.stdout.write(f"{name:>20} {statistics.median(samples):>8.2f} {p95:>8.2f} {per_call:>8.1f}")
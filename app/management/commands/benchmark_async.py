@@ -0,0 +1,61 @@
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+from app.authentication import invalidate_cached_user
+from app.models import Category, Comment, Issue, Location, User
+from .loadtest import Command as LoadTest, _percentile, _require_shared_cache
+
+
+class Command(BaseCommand):
+    help = ("Measure the sync read endpoints under gthread WSGI and ASGI against their async variants under ASGI, "
+            "all at the same worker count; data is committed so the server can see it, then deleted")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=settings.WEB_THREADS)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--duration', type=float, default=15)
+        parser.add_argument('--issues', type=int, default=100)
+        parser.add_argument('--port', type=int, default=8052)
+
+    def handle(self, *args, **options):
+        _require_shared_cache(options['workers'])
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', role='admin')
+        category = Category.objects.create(name=f'bench-{suffix}')
+        location = Location.objects.create(name=f'bench-{suffix}', location_type='others')
+        issues = [
+            Issue.objects.create(title=f'Async benchmark {n}', description='The projector will not turn on. ' * 5,
+                                 reporter=user, category=category, location=location)
+            for n in range(options['issues'])
+        ]
+        Comment.objects.bulk_create([
+            Comment(issue=issue, author=user, content='Still broken this morning') for issue in issues for _ in range(3)
+        ])
+        detail = issues[0].pk
+        endpoints = [
+            ('list', '/issues/?skip_count=1', '/async/issues/'),
+            ('detail', f'/issues/{detail}/', f'/async/issues/{detail}/'),
+            ('categories', '/categories/', '/async/categories/'),
+        ]
+        loadtest = LoadTest(stdout=self.stdout, stderr=self.stderr)
+        run = {**options, 'token': str(AccessToken.for_user(user))}
+        try:
+            self.stdout.write(f"{options['workers']} workers, {options['concurrency']} concurrent clients")
+            self.stdout.write(f"{'endpoint':>11} {'variant':>12} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'errors':>8}")
+            for name, sync_path, async_path in endpoints:
+                for variant, server, path in (('sync wsgi', 'wsgi', sync_path), ('sync asgi', 'asgi', sync_path),
+                                              ('async asgi', 'asgi', async_path)):
+                    requests, latencies, errors = loadtest._measure(
+                        options['workers'], {**run, 'server': server, 'path': path})
+                    self.stdout.write(
+                        f"{name:>11} {variant:>12} {requests / options['duration']:>10.1f} "
+                        f"{_percentile(latencies, 0.5) * 1000:>8.1f} {_percentile(latencies, 0.95) * 1000:>8.1f} {errors:>8}"
+                    )
+        finally:
+            Issue.objects.filter(pk__in=[issue.pk for issue in issues]).delete()
+            category.delete()
+            location.delete()
+            user.delete()
+            invalidate_cached_user(user.pk)
@@ -0,0 +1,64 @@
+import time
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from app.authentication import invalidate_cached_user
+from app.models import User
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = "Measure login and token refresh throughput in-process; all data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--hash-iterations', type=int, default=settings.PASSWORD_HASH_ITERATIONS,
+                            help="PBKDF2 work factor to benchmark with (PASSWORD_HASH_ITERATIONS)")
+
+    def handle(self, *args, **options):
+        with override_settings(PASSWORD_HASH_ITERATIONS=options['hash_iterations']), transaction.atomic():
+            username = f'bench-{uuid.uuid4().hex[:12]}'
+            user = User.objects.create_user(username=username, password='bench-password', email=f'{username}@example.com')
+            self._run(username, options['iterations'], options['hash_iterations'])
+            transaction.set_rollback(True)
+        invalidate_cached_user(user.pk)
+
+    def _run(self, username, iterations, hash_iterations):
+        client = Client()
+        device_id = str(uuid.uuid4())
+
+        refresh_token = None
+
+        def login():
+            nonlocal refresh_token
+            response = client.post('/auth/login/', {
+                'username': username, 'password': 'bench-password', 'device_id': device_id,
+            }, content_type='application/json')
+            refresh_token = response.json()['tokens']['refresh']
+            return response
+
+        def refresh():
+            nonlocal refresh_token
+            response = client.post('/auth/refresh/', {'refresh': refresh_token}, content_type='application/json')
+            refresh_token = response.json().get('refresh', refresh_token)
+            return response
+
+        self.stdout.write(f"PBKDF2 iterations: {hash_iterations}")
+        self.stdout.write(f"{'call':>8} {'req/s':>10} {'ms/call':>8} {'queries':>8} {'writes':>8} {'errors':>8}")
+        for name, call in (('login', login), ('refresh', refresh)):
+            errors = 0
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    if call().status_code != 200:
+                        errors += 1
+                elapsed = time.perf_counter() - started
+            writes = sum(query['sql'].lstrip().upper().startswith(WRITE_PREFIXES) for query in queries.captured_queries)
+            self.stdout.write(
+                f"{name:>8} {iterations / elapsed:>10.1f} {elapsed / iterations * 1000:>8.2f} "
+                f"{len(queries.captured_queries) / iterations:>8.1f} {writes / iterations:>8.1f} {errors:>8}"
+            )
@@ -0,0 +1,94 @@
+import time
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from app.models import Category, Issue, Location, User
+
+
+class Command(BaseCommand):
+    help = ("Compare creating and resolving N issues one request at a time against the bulk endpoints; "
+            "data is rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100)
+
+    def handle(self, *args, **options):
+        with override_settings(NOTIFICATION_WORKERS=0), transaction.atomic():
+            suffix = uuid.uuid4().hex[:8]
+            user = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', role='admin')
+            category = Category.objects.create(name=f'bench-{suffix}')
+            location = Location.objects.create(name='Bench hall', location_type='building')
+            self.client = APIClient()
+            self.client.force_authenticate(user)
+            payload = [
+                {'title': f'Inspection finding {n}', 'description': 'Loose handrail on the east stairwell',
+                 'category': category.pk, 'location': location.pk}
+                for n in range(options['items'])
+            ]
+            self.stdout.write(f"{'path':>10} {'step':>8} {'items/s':>9} {'queries':>8} {'errors':>7}")
+            for name, run in (('per-item', self._per_item), ('bulk', self._bulk)):
+                sid = transaction.savepoint()
+                run(payload)
+                transaction.savepoint_rollback(sid)
+            transaction.set_rollback(True)
+
+    def _measure(self, path, step, count, call):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            errors = call()
+            elapsed = time.perf_counter() - started
+        self.stdout.write(f"{path:>10} {step:>8} {count / elapsed:>9.1f} {len(queries.captured_queries):>8} {errors:>7}")
+
+    def _per_item(self, payload):
+        ids = []
+
+        def create():
+            errors = 0
+            for item in payload:
+                response = self.client.post('/issues/', item, format='json')
+                if response.status_code == 201:
+                    ids.append(response.data['id'])
+                else:
+                    errors += 1
+            return errors
+
+        def resolve():
+            return sum(
+                self.client.patch(f'/issues/{pk}/update_status/', {'status': 'resolved'}, format='json').status_code != 200
+                for pk in ids
+            )
+
+        self._measure('per-item', 'create', len(payload), create)
+        self._measure('per-item', 'resolve', len(ids), resolve)
+
+    def _bulk(self, payload):
+        ids = []
+
+        def chunks(items):
+            return [items[start:start + settings.BULK_MAX_ITEMS] for start in range(0, len(items), settings.BULK_MAX_ITEMS)]
+
+        def create():
+            errors = 0
+            for chunk in chunks(payload):
+                response = self.client.post('/issues/bulk_create/', {'issues': chunk}, format='json')
+                if response.status_code == 201:
+                    ids.extend(result['id'] for result in response.data['results'])
+                else:
+                    errors += len(chunk)
+            return errors
+
+        def resolve():
+            errors = 0
+            for chunk in chunks(ids):
+                response = self.client.post('/issues/bulk_update_status/', {
+                    'updates': [{'id': pk, 'status': 'resolved'} for pk in chunk],
+                }, format='json')
+                errors += 0 if response.status_code == 200 else len(chunk)
+            return errors
+
+        self._measure('bulk', 'create', len(payload), create)
+        self._measure('bulk', 'resolve', len(ids), resolve)
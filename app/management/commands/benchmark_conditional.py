@@ -0,0 +1,84 @@
+import random
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from app.authentication import invalidate_cached_user
+from app.models import Category, Issue, Location, User
+
+
+class Command(BaseCommand):
+    help = ("Replay a polling workload against the issue list and detail with and without ETag revalidation "
+            "and report bytes and CPU time; data is rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=20)
+        parser.add_argument('--polls', type=int, default=30, help="Polls per client")
+        parser.add_argument('--change-rate', type=float, default=0.01,
+                            help="Chance that an issue changes between two polling rounds")
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with override_settings(NOTIFICATION_WORKERS=0), transaction.atomic():
+            user, issues = self._seed(options['page_size'])
+            workload = self._record(issues, options)
+            self.stdout.write(f"{'mode':>12} {'requests':>9} {'304s':>6} {'KB sent':>9} {'CPU s':>7}")
+            for mode in ('unconditional', 'etag'):
+                self._replay(user, issues, workload, mode, options)
+            transaction.set_rollback(True)
+        invalidate_cached_user(user.pk)
+
+    def _seed(self, page_size):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com',
+                                        first_name='Bench', last_name='Poller', role='admin')
+        category = Category.objects.create(name=f'bench-{suffix}')
+        location = Location.objects.create(name='Bench hall', location_type='building')
+        issues = [
+            Issue.objects.create(title=f'Polling issue {n}', description='The heater rattles all night. ' * 10,
+                                 reporter=user, category=category, location=location)
+            for n in range(page_size)
+        ]
+        return user, issues
+
+    def _record(self, issues, options):
+        """Which issues change in each polling round, and the URL each client polls: the feed or one issue."""
+        rng = random.Random(0)
+        urls = [
+            f"/issues/?page_size={options['page_size']}&skip_count=1" if client % 2 == 0
+            else f'/issues/{rng.choice(issues).pk}/'
+            for client in range(options['clients'])
+        ]
+        return [
+            ([issue for issue in issues if rng.random() < options['change_rate']], urls)
+            for _ in range(options['polls'])
+        ]
+
+    def _replay(self, user, issues, workload, mode, options):
+        sid = transaction.savepoint()
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        etags = {}
+        requests = not_modified = sent = 0
+        cpu = 0.0
+        for changed, urls in workload:
+            for issue in changed:
+                issue.refresh_from_db()
+                issue.description += '.'
+                issue.save(update_fields=['description', 'updated_at'])
+            for index, url in enumerate(urls):
+                headers = {}
+                if mode == 'etag' and (index, url) in etags:
+                    headers['HTTP_IF_NONE_MATCH'] = etags[(index, url)]
+                started = time.process_time()
+                response = client.get(url, **headers)
+                cpu += time.process_time() - started
+                requests += 1
+                sent += len(response.content)
+                if response.status_code == 304:
+                    not_modified += 1
+                elif response.has_header('ETag'):
+                    etags[(index, url)] = response['ETag']
+        transaction.savepoint_rollback(sid)
+        self.stdout.write(f"{mode:>12} {requests:>9} {not_modified:>6} {sent / 1024:>9.1f} {cpu:>7.2f}")
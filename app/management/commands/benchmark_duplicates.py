@@ -0,0 +1,153 @@
+import io
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+from app.choices import ImageStatusChoices
+from app.duplicates import find_duplicates, index_issues
+from app.images import hash_bands, image_phash
+from app.models import Category, Issue, IssueImage, Location, PerceptualHashBand, User
+
+WORDS = (
+    'light projector socket leak pipe door window chair desk heater fan cable router wifi printer lock toilet '
+    'sink tap ceiling floor wall paint crack noise smell power switch screen board marker lift stairs handrail '
+    'carpet tile bench shelf locker mirror boiler radiator vent filter alarm sensor camera speaker microphone '
+    'keyboard mouse monitor laptop charger plug fuse bulb lamp blind curtain glass hinge handle latch bin '
+    'drain gutter roof leaking broken flickering loud cold hot wet dirty jammed missing loose cracked stuck'
+).split()
+
+
+def _text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def _paraphrase(rng, text, edits):
+    """The same report in slightly different words: a few words replaced."""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words)
+
+
+def _photo(rng):
+    blocks = Image.new('L', (16, 12))
+    blocks.putdata([rng.randrange(256) for _ in range(16 * 12)])
+    return blocks.resize((640, 480), Image.Resampling.BILINEAR).convert('RGB')
+
+
+def _retake(img):
+    """The same scene resized and re-encoded by another phone."""
+    buffer = io.BytesIO()
+    img.resize((480, 360)).save(buffer, 'JPEG', quality=70)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+class Command(BaseCommand):
+    help = ("Measure duplicate-detection precision, recall and lookup latency on a synthetic corpus as it grows; "
+            "data is rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,5000,20000',
+                            help="Comma-separated background issue counts to measure at")
+        parser.add_argument('--pairs', type=int, default=100, help="Reports that duplicate an earlier issue")
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--edits', type=int, default=3, help="Words changed between a report and its duplicate")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+        with transaction.atomic():
+            self.rng = random.Random(0)
+            self.reporter = User.objects.create_user(username='bench-duplicates', email='bench-duplicates@example.com')
+            self.category = Category.objects.create(name='bench-duplicates')
+            self.locations = [
+                Location.objects.create(name=f'bench-duplicates-{n}', location_type='others')
+                for n in range(options['locations'])
+            ]
+            probes = self._seed_probes(options)
+            seeded = 0
+            self.stdout.write(f"{'issues':>8} {'precision':>10} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7}")
+            for size in sizes:
+                self._seed_background(seeded, size)
+                seeded = size
+                self._measure(size, probes)
+            transaction.set_rollback(True)
+
+    def _issues(self, texts):
+        """Insert and index issues for ``[(location, title, description)]``."""
+        issues = Issue.objects.bulk_create([
+            Issue(title=title, description=description, reporter=self.reporter, category=self.category,
+                  location=location)
+            for location, title, description in texts
+        ])
+        index_issues(issues)
+        return issues
+
+    def _images(self, pairs):
+        """Attach a processed photo with dHash ``phash`` to each issue in ``[(issue, phash)]``."""
+        images = IssueImage.objects.bulk_create([
+            IssueImage(issue=issue, image='issue_images/bench.jpg', status=ImageStatusChoices.READY, phash=phash)
+            for issue, phash in pairs
+        ])
+        PerceptualHashBand.objects.bulk_create([
+            PerceptualHashBand(image=image, band=band, value=value)
+            for image in images
+            for band, value in enumerate(hash_bands(int(image.phash, 16)))
+        ])
+
+    def _seed_probes(self, options):
+        """
+        Originals and the later reports that duplicate them, plus as many
+        unrelated reports at the same locations. Each probe is
+        ``(issue, phashes, expected original id or None)``.
+        """
+        rng = self.rng
+        originals, duplicates, photos = [], [], []
+        for _ in range(options['pairs']):
+            location = rng.choice(self.locations)
+            title, description = _text(rng, 4), _text(rng, 25)
+            originals.append((location, title, description))
+            duplicates.append((location, _paraphrase(rng, title, 1), _paraphrase(rng, description, options['edits'])))
+            photos.append(_photo(rng))
+        unrelated = [(location, _text(rng, 4), _text(rng, 25)) for location, _, _ in originals]
+        originals = self._issues(originals)
+        self._images([(issue, image_phash(photo)) for issue, photo in zip(originals, photos)])
+        duplicates = self._issues(duplicates)
+        unrelated = self._issues(unrelated)
+        probes = [
+            (issue, [image_phash(_retake(photo))], original.pk)
+            for issue, photo, original in zip(duplicates, photos, originals)
+        ]
+        probes.extend((issue, [image_phash(_photo(rng))], None) for issue in unrelated)
+        return probes
+
+    def _seed_background(self, start, stop):
+        rng = self.rng
+        batch = 2000
+        for offset in range(start, stop, batch):
+            issues = self._issues([
+                (rng.choice(self.locations), _text(rng, 4), _text(rng, 25))
+                for _ in range(offset, min(offset + batch, stop))
+            ])
+            self._images([(issue, f'{rng.getrandbits(64):016x}') for issue in issues[::3]])
+
+    def _measure(self, size, probes):
+        timings = []
+        returned = correct = found = 0
+        for issue, phashes, expected in probes:
+            started = time.perf_counter()
+            matches = find_duplicates(issue, phashes)
+            timings.append((time.perf_counter() - started) * 1000)
+            returned += len(matches)
+            correct += sum(issue_id == expected for issue_id, _ in matches)
+            found += expected is not None and any(issue_id == expected for issue_id, _ in matches)
+        expected_total = sum(expected is not None for _, _, expected in probes)
+        precision = correct / returned if returned else 1.0
+        recall = found / expected_total if expected_total else 1.0
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(f"{size:>8} {precision:>10.2f} {recall:>7.2f} {statistics.median(timings):>7.1f} {p95:>7.1f}")
@@ -0,0 +1,66 @@
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from app.exports import export_issues
+from app.models import Category, Issue, IssueStatusHistory, Location, User
+
+
+class Command(BaseCommand):
+    help = "Export a synthetic issue table and report memory as rows stream out; all data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--file-format', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--reports', type=int, default=10, help="Number of progress lines to print")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._seed(options['rows'])
+            self._export(options)
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        started = time.perf_counter()
+        user = User.objects.create_user(username='bench-export', email='bench-export@example.com')
+        category = Category.objects.create(name='bench-export')
+        location = Location.objects.create(name='bench-export', location_type='others')
+        batch = 10_000
+        for offset in range(0, rows, batch):
+            issues = Issue.objects.bulk_create([
+                Issue(title=f'Synthetic issue {n}', description='Synthetic export row ' * 5,
+                      reporter=user, category=category, location=location)
+                for n in range(offset, min(offset + batch, rows))
+            ])
+            IssueStatusHistory.objects.bulk_create([
+                IssueStatusHistory(issue=issue, changed_by=user, old_status='reported', new_status='acknowledged')
+                for issue in issues[::10]
+            ])
+        self.stdout.write(f"Seeded {rows} issues in {time.perf_counter() - started:.1f}s")
+
+    def _export(self, options):
+        every = max(options['rows'] // options['reports'], 1)
+        self.stdout.write(f"{'rows':>10} {'MB out':>10} {'current MB':>11} {'peak MB':>8} {'rows/s':>9}")
+        tracemalloc.start()
+        started = time.perf_counter()
+        lines = written = 0
+        header = 1 if options['file_format'] == 'csv' else 0
+        next_report = every
+
+        def report():
+            current, peak = tracemalloc.get_traced_memory()
+            self.stdout.write(
+                f"{lines - header:>10} {written / 2 ** 20:>10.1f} {current / 2 ** 20:>11.1f} "
+                f"{peak / 2 ** 20:>8.1f} {(lines - header) / (time.perf_counter() - started):>9.0f}"
+            )
+
+        for chunk in export_issues(Issue.objects.all(), options['file_format'], options['chunk_size']):
+            written += len(chunk)
+            lines += chunk.count('\n')
+            if lines - header >= next_report:
+                report()
+                next_report = ((lines - header) // every + 1) * every
+        if (lines - header) % every:
+            report()
+        tracemalloc.stop()
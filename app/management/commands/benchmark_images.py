@@ -0,0 +1,81 @@
+import io
+import statistics
+import tempfile
+import time
+import uuid
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from app.images import process_issue_image
+from app.models import Category, IssueImage, Location, User
+
+
+def _photo(width, height, seed):
+    """A noisy JPEG that compresses about as badly as a phone photo."""
+    noise = [Image.effect_noise((width, height), 40 + seed + band) for band in range(3)]
+    buffer = io.BytesIO()
+    Image.merge('RGB', noise).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = ("Measure issue creation latency with photo uploads, background processing time, and the bytes a "
+            "client downloads for the original against each rendition; data and files are discarded")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uploads', type=int, default=10)
+        parser.add_argument('--width', type=int, default=4032)
+        parser.add_argument('--height', type=int, default=3024)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root, IMAGE_PIPELINE_INLINE_WORKERS=0, NOTIFICATION_WORKERS=0), \
+                transaction.atomic():
+            self._run(options)
+            transaction.set_rollback(True)
+
+    def _run(self, options):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        category = Category.objects.create(name=f'bench-{suffix}')
+        location = Location.objects.create(name='Bench hall', location_type='building')
+        client = APIClient()
+        client.force_authenticate(user)
+        photos = [_photo(options['width'], options['height'], n) for n in range(options['uploads'])]
+
+        request_times, inline_times, process_times = [], [], []
+        for n, photo in enumerate(photos):
+            upload = SimpleUploadedFile(f'photo{n}.jpg', photo, content_type='image/jpeg')
+            started = time.perf_counter()
+            response = client.post('/issues/', {
+                'title': f'Photo issue {n}', 'description': 'Water stain on the ceiling tiles',
+                'category': category.pk, 'location': location.pk, 'images': [upload],
+            }, format='multipart')
+            request_times.append(time.perf_counter() - started)
+            if response.status_code != 201:
+                self.stderr.write(f"Upload {n} failed with {response.status_code}")
+                continue
+            image = IssueImage.objects.get(issue_id=response.data['id'])
+            started = time.perf_counter()
+            process_issue_image(image.pk)
+            process_times.append(time.perf_counter() - started)
+            inline_times.append(request_times[-1] + process_times[-1])
+        if not process_times:
+            return
+
+        self.stdout.write(f"{len(process_times)} uploads of {options['width']}x{options['height']} JPEGs")
+        self.stdout.write(f"{'path':>22} {'p50 ms':>8} {'max ms':>8}")
+        for label, timings in (('processed in request', inline_times), ('deferred (request)', request_times),
+                               ('deferred (background)', process_times)):
+            self.stdout.write(f"{label:>22} {statistics.median(timings) * 1000:>8.1f} {max(timings) * 1000:>8.1f}")
+
+        images = list(IssueImage.objects.filter(issue__reporter=user))
+        self.stdout.write(f"{'file':>22} {'mean KB':>8}")
+        self.stdout.write(f"{'upload':>22} {statistics.mean(len(photo) for photo in photos) / 1024:>8.1f}")
+        for name in ('image', *settings.IMAGE_RENDITIONS):
+            label = 'stored original' if name == 'image' else name
+            self.stdout.write(f"{label:>22} {statistics.mean(getattr(image, name).size for image in images) / 1024:>8.1f}")
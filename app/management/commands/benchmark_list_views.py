@@ -0,0 +1,54 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from app.authentication import invalidate_cached_user
+from app.models import Category, Issue, Location, User
+
+
+class Command(BaseCommand):
+    help = "Compare response bytes and CPU time per page of the full and ?view=compact issue feeds; data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--reporters', type=int, default=5,
+                            help="Distinct reporters spread over the page")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self._seed(options['page_size'], options['reporters'])
+            self._compare(user, options)
+            transaction.set_rollback(True)
+        invalidate_cached_user(user.pk)
+
+    def _seed(self, page_size, reporter_count):
+        suffix = uuid.uuid4().hex[:8]
+        reporters = [
+            User.objects.create_user(username=f'bench-{suffix}-{n}', email=f'bench-{suffix}-{n}@example.com',
+                                     first_name='Bench', last_name=f'Reporter {n}', role='student')
+            for n in range(reporter_count)
+        ]
+        categories = [Category.objects.create(name=f'bench-{suffix}-{n}', description='Benchmark category') for n in range(3)]
+        locations = [Location.objects.create(name=f'Bench hall {n}', location_type='building', building='Main')
+                     for n in range(3)]
+        Issue.objects.bulk_create([
+            Issue(title=f'Benchmark issue {n}', description='The projector flickers and then turns off. ' * 12,
+                  reporter=reporters[n % reporter_count], category=categories[n % 3], location=locations[n % 3])
+            for n in range(page_size)
+        ])
+        return reporters[0]
+
+    def _compare(self, user, options):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        base = f"/issues/?page_size={options['page_size']}&skip_count=1"
+        self.stdout.write(f"{'view':>8} {'bytes/page':>11} {'CPU ms/page':>12}")
+        for name, url in (('full', base), ('compact', f'{base}&view=compact')):
+            client.get(url)
+            started = time.process_time()
+            for _ in range(options['repeat']):
+                response = client.get(url)
+            cpu = (time.process_time() - started) / options['repeat']
+            self.stdout.write(f"{name:>8} {len(response.content):>11} {cpu * 1000:>12.2f}")
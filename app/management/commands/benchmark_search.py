@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework import filters
+from rest_framework.request import Request
+from app.filters import IssueOrderingFilter, IssueSearchFilter
+from app.models import Category, Issue, Location, User
+from app.search import search_enabled, update_search_vectors
+
+WORDS = (
+    'light projector socket leak pipe door window chair desk heater fan cable router wifi printer lock '
+    'toilet sink tap ceiling floor wall paint crack noise smell power switch screen board marker'
+).split()
+RARE_WORDS = ['flickering', 'waterlogged', 'shattered']
+QUERIES = ['projector', 'leak pipe', 'flickering', 'shattered window', 'broken router wifi']
+
+
+class _View:
+    search_fields = ['title', 'description']
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+
+    def __init__(self, request):
+        self.request = request
+
+
+class Command(BaseCommand):
+    help = "Compare full-text issue search with the old ILIKE SearchFilter as the table grows; data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,50000,200000',
+                            help="Comma-separated issue counts to measure at")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING("Not on PostgreSQL: both filters fall back to ILIKE"))
+        with transaction.atomic():
+            reporter = User.objects.create_user(username='bench-search', email='bench-search@example.com')
+            category = Category.objects.create(name='bench-search')
+            location = Location.objects.create(name='bench-search', location_type='others')
+            rng = random.Random(0)
+            seeded = 0
+            self.stdout.write(f"{'rows':>8} {'query':>20} {'ILIKE ms':>9} {'full-text ms':>13} {'matches':>8}")
+            for size in sizes:
+                self._seed(rng, seeded, size, reporter, category, location)
+                seeded = size
+                for terms in QUERIES:
+                    ilike, full_text, matches = self._compare(terms, options)
+                    self.stdout.write(f"{size:>8} {terms:>20} {ilike:>9.1f} {full_text:>13.1f} {matches:>8}")
+            transaction.set_rollback(True)
+
+    def _seed(self, rng, start, stop, reporter, category, location):
+        batch = 5000
+        for offset in range(start, stop, batch):
+            issues = Issue.objects.bulk_create([
+                Issue(
+                    title=' '.join(rng.choices(WORDS, k=4)),
+                    description=' '.join(rng.choices(WORDS, k=40) + ([rng.choice(RARE_WORDS)] if n % 1000 == 0 else [])),
+                    reporter=reporter, category=category, location=location,
+                )
+                for n in range(offset, min(offset + batch, stop))
+            ])
+            update_search_vectors(Issue.objects.filter(pk__in=[issue.pk for issue in issues]))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE app_issue')
+
+    def _page(self, search_filter, terms, page_size):
+        request = Request(RequestFactory().get('/issues/', {'search': terms}))
+        view = _View(request)
+        queryset = search_filter.filter_queryset(request, Issue.objects.all(), view)
+        queryset = IssueOrderingFilter().filter_queryset(request, queryset, view)
+        started = time.perf_counter()
+        matches = queryset.count()
+        list(queryset[:page_size])
+        return (time.perf_counter() - started) * 1000, matches
+
+    def _compare(self, terms, options):
+        results = []
+        for search_filter in (filters.SearchFilter(), IssueSearchFilter()):
+            timings = []
+            for _ in range(options['repeat']):
+                elapsed, matches = self._page(search_filter, terms, options['page_size'])
+                timings.append(elapsed)
+            results.append((statistics.median(timings), matches))
+        (ilike, _), (full_text, matches) = results
+        return ilike, full_text, matches
@@ -0,0 +1,82 @@
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+from app.authentication import invalidate_cached_user
+from app.counters import flush_upvote_shards
+from app.models import Category, Issue, Location, Upvote, User
+
+
+class Command(BaseCommand):
+    help = ("Hammer one issue with upvote toggles from many threads and check the final count is exact; "
+            "the data is committed so threads can see it, then deleted")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--toggles', type=int, default=25, help="Upvote toggles per thread")
+        parser.add_argument('--shards', type=int, default=0, help="UPVOTE_COUNTER_SHARDS to run with")
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create([
+            User(username=f'bench-{suffix}-{n}', email=f'bench-{suffix}-{n}@example.com', password='!')
+            for n in range(options['threads'])
+        ])
+        category = Category.objects.create(name=f'bench-{suffix}')
+        location = Location.objects.create(name=f'bench-{suffix}', location_type='others')
+        issue = Issue.objects.create(title='Upvote benchmark', description='Benchmark', reporter=users[0],
+                                     category=category, location=location)
+        try:
+            with override_settings(UPVOTE_COUNTER_SHARDS=options['shards'], NOTIFICATION_WORKERS=0):
+                self._run(issue, users, options)
+        finally:
+            issue.delete()
+            category.delete()
+            location.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            for user in users:
+                invalidate_cached_user(user.pk)
+
+    def _run(self, issue, users, options):
+        errors = []
+        lock = threading.Lock()
+
+        def hammer(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                for _ in range(options['toggles']):
+                    try:
+                        status = client.post(f'/issues/{issue.pk}/upvote/').status_code
+                    except DatabaseError as exc:
+                        status = type(exc).__name__
+                    if status not in (200, 201):
+                        with lock:
+                            errors.append(status)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=hammer, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if options['shards']:
+            while flush_upvote_shards():
+                pass
+
+        total = len(users) * options['toggles']
+        counted = Issue.objects.values_list('upvotes_count', flat=True).get(pk=issue.pk)
+        rows = Upvote.objects.filter(issue=issue).count()
+        self.stdout.write(f"{total} toggles from {len(users)} threads in {elapsed:.2f}s: "
+                          f"{total / elapsed:.1f} toggles/s, {len(errors)} errors")
+        self.stdout.write(f"upvotes_count={counted} upvote rows={rows}")
+        if counted == rows:
+            self.stdout.write(self.style.SUCCESS("Final count is exact"))
+        else:
+            self.stdout.write(self.style.ERROR(f"Final count is off by {counted - rows}"))
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from app.authentication import compact_auth_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete device sessions (AuthToken rows) whose access and refresh tokens have all expired"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Keep running and compact every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            while deleted := compact_auth_tokens(options['batch_size']):
+                self.stdout.write(f"Deleted {deleted} expired device sessions")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
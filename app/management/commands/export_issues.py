@@ -0,0 +1,41 @@
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from app.exports import EXPORT_FORMATS, export_issues, gzip_stream
+from app.filters import IssueFilter
+from app.models import Issue
+
+
+class Command(BaseCommand):
+    help = "Stream every issue with its status history to CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file-format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write; defaults to stdout")
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--filter', action='append', default=[], metavar='FIELD=VALUE',
+                            help="Same filters as the issue list endpoint, e.g. --filter status=resolved")
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        data = {}
+        for item in options['filter']:
+            field, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"--filter expects FIELD=VALUE, got {item!r}")
+            data[field] = value
+        filterset = IssueFilter(data, queryset=Issue.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filters: {dict(filterset.errors)}")
+
+        chunks = export_issues(filterset.qs, options['file_format'], options['chunk_size'])
+        chunks = gzip_stream(chunks) if options['gzip'] else (chunk.encode() for chunk in chunks)
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from app.counters import flush_upvote_shards
+
+
+class Command(BaseCommand):
+    help = "Fold buffered upvote shard deltas into Issue.upvotes_count"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Keep running and flush every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            while flushed := flush_upvote_shards(options['batch_size']):
+                self.stdout.write(f"Flushed upvotes for {flushed} issues")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,117 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _wait_for_port(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def _require_shared_cache(worker_count):
+    """Fail before starting a server that gunicorn.conf.py would refuse to run."""
+    if worker_count > 1 and not settings.CACHE_SHARED:
+        raise CommandError(f"{worker_count} workers need a shared CACHE_BACKEND; LocMemCache is per process")
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Start the production server at increasing worker counts and measure throughput against one endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/issues/?skip_count=1')
+        parser.add_argument('--token', default='', help="Access token sent as a Bearer header")
+        parser.add_argument('--workers', default='1,2,4,8',
+                            help="Comma-separated server worker counts to measure")
+        parser.add_argument('--threads', type=int, default=settings.WEB_THREADS)
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default=settings.WEB_SERVER)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=15)
+        parser.add_argument('--port', type=int, default=8050)
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(count) for count in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers")
+        _require_shared_cache(max(worker_counts))
+
+        self.stdout.write(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'errors':>8}")
+        for count in worker_counts:
+            requests, latencies, errors = self._measure(count, options)
+            self.stdout.write(
+                f"{count:>8} {requests / options['duration']:>10.1f} "
+                f"{_percentile(latencies, 0.5) * 1000:>8.1f} {_percentile(latencies, 0.95) * 1000:>8.1f} {errors:>8}"
+            )
+
+    def _measure(self, worker_count, options):
+        env = {
+            **os.environ,
+            'WEB_SERVER': options['server'],
+            'WEB_WORKERS': str(worker_count),
+            'WEB_THREADS': str(options['threads']),
+            'WEB_BIND': f"127.0.0.1:{options['port']}",
+            'DEBUG': '0',
+        }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not _wait_for_port('127.0.0.1', options['port'], 30):
+                raise CommandError(f"Server with {worker_count} workers did not start")
+            return self._drive(options)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def _drive(self, options):
+        url = f"http://127.0.0.1:{options['port']}{options['path']}"
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        lock = threading.Lock()
+        latencies = []
+        errors = 0
+        deadline = time.monotonic() + options['duration']
+
+        def client():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+                        response.read()
+                    ok = True
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                elapsed = time.monotonic() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+        clients = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        return len(latencies), latencies, errors
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from app.authentication import invalidate_cached_user
+from app.models import Category, Issue, Location, User
+from .loadtest import _percentile, _require_shared_cache, _wait_for_port
+
+
+class _Stream:
+    """One idle SSE subscriber: when it connected, and when the published event reached it."""
+
+    def __init__(self):
+        self.connect_time = None
+        self.event_at = None
+        self.keepalives = 0
+        self.closed = False
+
+
+class Command(BaseCommand):
+    help = ("Start the ASGI server, hold thousands of idle /stream/ subscriptions open, publish one event "
+            "and measure connect time, fan-out latency and how many connections survive; data is deleted after")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Server workers; above 1 events only reach every worker with REALTIME_BACKPLANE=postgres")
+        parser.add_argument('--backplane', choices=['local', 'postgres'], default=settings.REALTIME_BACKPLANE)
+        parser.add_argument('--hold', type=float, default=60, help="Seconds to keep the connections idle")
+        parser.add_argument('--connect-concurrency', type=int, default=100)
+        parser.add_argument('--port', type=int, default=8051)
+
+    def handle(self, *args, **options):
+        _require_shared_cache(options['workers'])
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = options['connections'] + 256
+        if soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+            if hard < wanted:
+                self.stdout.write(self.style.WARNING(f"Open file limit is {hard}; some connections will fail"))
+
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        category = Category.objects.create(name=f'bench-{suffix}')
+        location = Location.objects.create(name=f'bench-{suffix}', location_type='others')
+        issue = Issue.objects.create(title='Stream load test', description='Load test', reporter=user,
+                                     category=category, location=location)
+        server = self._start_server(options)
+        try:
+            if not _wait_for_port('127.0.0.1', options['port'], 30):
+                raise CommandError("ASGI server did not start")
+            asyncio.run(self._drive(issue, str(AccessToken.for_user(user)), options))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            issue.delete()
+            category.delete()
+            location.delete()
+            user.delete()
+            invalidate_cached_user(user.pk)
+
+    def _start_server(self, options):
+        env = {
+            **os.environ,
+            'WEB_SERVER': 'asgi',
+            'WEB_WORKERS': str(options['workers']),
+            'WEB_BIND': f"127.0.0.1:{options['port']}",
+            'REALTIME_BACKPLANE': options['backplane'],
+            'DEBUG': '0',
+        }
+        return subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    async def _open(self, stream, issue, token, port, gate):
+        async with gate:
+            started = time.monotonic()
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(
+                    f'GET /stream/?issue={issue.pk} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                    f'Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n'.encode()
+                )
+                await writer.drain()
+                status = await reader.readline()
+                if b' 200 ' not in status:
+                    writer.close()
+                    return None
+                while (await reader.readline()).strip():
+                    pass
+            except OSError:
+                return None
+            stream.connect_time = time.monotonic() - started
+        return reader, writer
+
+    async def _listen(self, stream, connection):
+        reader, writer = connection
+        try:
+            while line := await reader.readline():
+                if line.startswith(b'event:') and stream.event_at is None:
+                    stream.event_at = time.monotonic()
+                elif line.startswith(b': keepalive'):
+                    stream.keepalives += 1
+        except OSError:
+            pass
+        finally:
+            stream.closed = True
+            writer.close()
+
+    def _upvote(self, issue, token, port):
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{port}/issues/{issue.pk}/upvote/', method='POST',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    async def _drive(self, issue, token, options):
+        gate = asyncio.Semaphore(options['connect_concurrency'])
+        streams = [_Stream() for _ in range(options['connections'])]
+        started = time.monotonic()
+        connections = await asyncio.gather(*[
+            self._open(stream, issue, token, options['port'], gate) for stream in streams
+        ])
+        opened = [(stream, connection) for stream, connection in zip(streams, connections) if connection]
+        connect_times = [stream.connect_time for stream, _ in opened]
+        self.stdout.write(f"{len(opened)}/{len(streams)} subscriptions open in {time.monotonic() - started:.1f}s "
+                          f"(connect p50 {_percentile(connect_times, 0.5) * 1000:.1f} ms, "
+                          f"p95 {_percentile(connect_times, 0.95) * 1000:.1f} ms)")
+        listeners = [asyncio.create_task(self._listen(stream, connection)) for stream, connection in opened]
+
+        await asyncio.sleep(options['hold'] / 2)
+        published = time.monotonic()
+        status = await asyncio.to_thread(self._upvote, issue, token, options['port'])
+        deadline = published + 10
+        while time.monotonic() < deadline and any(stream.event_at is None for stream, _ in opened):
+            await asyncio.sleep(0.05)
+        delays = [stream.event_at - published for stream, _ in opened if stream.event_at is not None]
+        self.stdout.write(f"Upvote returned {status}; event reached {len(delays)}/{len(opened)} subscribers "
+                          f"(p50 {_percentile(delays, 0.5) * 1000:.1f} ms, p95 {_percentile(delays, 0.95) * 1000:.1f} ms, "
+                          f"max {max(delays, default=0) * 1000:.1f} ms)")
+
+        await asyncio.sleep(max(0, options['hold'] - (time.monotonic() - published)))
+        alive = sum(not stream.closed for stream, _ in opened)
+        keepalives = sum(stream.keepalives for stream, _ in opened)
+        self.stdout.write(f"{alive}/{len(opened)} subscriptions still open after {options['hold']:.0f}s, "
+                          f"{keepalives} keepalives received")
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
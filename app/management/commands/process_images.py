@@ -0,0 +1,25 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from app.images import pending_image_ids, process_image_job, requeue_images
+
+
+class Command(BaseCommand):
+    help = "Process queued issue images into thumbnail/medium renditions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Keep running and poll the queue every N seconds")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                requeue_images()
+                while ids := pending_image_ids(options['batch_size']):
+                    processed = sum(pool.map(process_image_job, ids))
+                    self.stdout.write(f"Processed {processed} images")
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from app.analytics import rebuild_rollups
+from app.models import Issue
+
+
+class Command(BaseCommand):
+    help = "Recount the analytics rollup tables from every existing issue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_rollups(Issue.objects.all(), options['batch_size'])
+        self.stdout.write(f"Rebuilt analytics rollups from {total} issues")
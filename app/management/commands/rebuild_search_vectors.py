@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from app.models import Issue
+from app.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute Issue.search_vector for existing issues"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                Issue.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += update_search_vectors(Issue.objects.filter(pk__in=ids))
+            last_id = ids[-1]
+        self.stdout.write(f"Updated search vectors for {total} issues")
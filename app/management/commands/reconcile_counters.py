@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from app.counters import reconcile_counters
+from app.models import Issue
+
+
+class Command(BaseCommand):
+    help = "Recount Issue.comments_count and upvotes_count and fix any drift, one pk range per UPDATE"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Issue ids covered by each UPDATE")
+
+    def handle(self, *args, **options):
+        bounds = Issue.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            self.stdout.write("No issues to reconcile")
+            return
+        fixed = 0
+        for start in range(bounds['first'], bounds['last'] + 1, options['batch_size']):
+            fixed += reconcile_counters(start, start + options['batch_size'] - 1)
+        self.stdout.write(f"Corrected counters on {fixed} issues")
@@ -0,0 +1,49 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from app.sla import backfill_due_dates, leader_lock, run_tick
+
+
+class Command(BaseCommand):
+    help = "Warn about and escalate issues approaching or past their SLA deadline, in a loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=settings.SLA_TICK_SECONDS,
+                            help="Seconds between ticks")
+        parser.add_argument('--batch-size', type=int, default=settings.SLA_BATCH_SIZE)
+        parser.add_argument('--once', action='store_true', help="Run a single tick and exit")
+        parser.add_argument('--backfill', action='store_true',
+                            help="First set due_at on open issues that have none")
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stopping.set())
+        if options['backfill']:
+            filled = backfill_due_dates(options['batch_size'])
+            self.stdout.write(f"Set due_at on {filled} open issues")
+        leading = False
+        while not stopping.is_set():
+            try:
+                with leader_lock() as is_leader:
+                    while not stopping.is_set():
+                        if is_leader():
+                            if not leading:
+                                self.stdout.write("Acquired the SLA leader lock")
+                                leading = True
+                            warned, escalated = run_tick(options['batch_size'])
+                            if warned or escalated or options['once']:
+                                self.stdout.write(f"Warned {warned}, escalated {escalated}")
+                        if options['once']:
+                            return
+                        stopping.wait(options['interval'])
+            except DatabaseError as exc:
+                # The lock went with the connection; wait and compete for it again.
+                self.stderr.write(f"SLA worker lost its database connection: {exc}")
+                leading = False
+                connection.close()
+                if options['once']:
+                    raise
+                stopping.wait(options['interval'])
@@ -1,11 +1,16 @@
 import os
 import binascii
 from django.contrib.auth.models import AbstractUser
-from .choices import RoleChoices, LocationTypeChoices, PriorityChoices, StatusChoices, NotificationChoices
+from datetime import timedelta
+from .choices import RoleChoices, LocationTypeChoices, PriorityChoices, StatusChoices, NotificationChoices, ImageStatusChoices, SLAStageChoices, PRIORITY_SEVERITY
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from .cache import reference_caches
+from .storage import content_storage
 
 
 class AuthToken(models.Model):
@@ -52,7 +57,7 @@ class User(AbstractUser):
     employee_id = models.CharField(max_length=20, blank=True, null=True)
     department = models.CharField(max_length=100, blank=True)
     phone_number = models.CharField(max_length=15, null=True, blank=True)
-    profile_picture = models.ImageField(upload_to='profiles/', null=True, blank=True)
+    profile_picture = models.ImageField(upload_to='profiles/', storage=content_storage, null=True, blank=True)
     is_verified = models.BooleanField(default=False)
     designation = models.CharField(max_length=25, null=True, blank=True)
     office_location = models.CharField(max_length=100, blank=True)
@@ -138,6 +143,7 @@ class Category(models.Model):
     icon = models.CharField(max_length=50, null=True)
     color = models.CharField(max_length=10, null=True)
     is_active = models.BooleanField(default=False)
+    sla_hours = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -156,6 +162,10 @@ class Location(models.Model):
     
     
     
+# Changing any of these moves an issue's SLA deadline.
+SLA_FIELDS = {'priority', 'category', 'category_id', 'estimated_resolution_time'}
+
+
 class Issue(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -163,32 +173,156 @@ class Issue(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='issues')
     location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='issues')
     priority = models.CharField(max_length=20, choices=PriorityChoices.choices, default='medium')
+    severity = models.PositiveSmallIntegerField(default=PRIORITY_SEVERITY[PriorityChoices.MEDIUM], editable=False)
     status = models.CharField(max_length=20, choices=StatusChoices.choices, default='reported')
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_issues')
     upvotes_count = models.PositiveIntegerField(default=0)
     comments_count = models.PositiveIntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     is_anonymous = models.BooleanField(default=False)
     estimated_resolution_time = models.DurationField(null=True, blank=True)
+    due_at = models.DateTimeField(null=True, blank=True, editable=False)
+    sla_stage = models.PositiveSmallIntegerField(choices=SLAStageChoices.choices, default=SLAStageChoices.ON_TRACK, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    minhash = models.JSONField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='issue_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='issue_search_vector_idx'),
+            models.Index(fields=['status', '-created_at'], name='issue_status_created_idx'),
+            models.Index(fields=['location', 'status'], name='issue_location_status_idx'),
+            models.Index(fields=['category', 'status'], name='issue_category_status_idx'),
+            models.Index(
+                fields=['assigned_to', 'status'],
+                name='issue_assignee_status_idx',
+                condition=models.Q(assigned_to__isnull=False),
+            ),
+            models.Index(
+                fields=['status', '-severity', '-upvotes_count', 'created_at', 'id'],
+                name='issue_triage_idx',
+            ),
+            models.Index(
+                fields=['status', 'due_at'],
+                name='issue_sla_queue_idx',
+                condition=models.Q(sla_stage__lt=SLAStageChoices.BREACHED),
+            ),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_sla_inputs = instance._sla_inputs()
+        return instance
+    
+    def _sla_inputs(self):
+        # Read from __dict__ so deferred fields are not fetched.
+        return tuple(self.__dict__.get(field) for field in ('priority', 'category_id', 'estimated_resolution_time'))
+    
+    def compute_due_at(self):
+        """
+        The SLA deadline: created_at plus estimated_resolution_time when set,
+        otherwise the shorter of the priority's SLA_PRIORITY_HOURS and the
+        category's sla_hours.
+        """
+        if self.estimated_resolution_time is not None:
+            return self.created_at + self.estimated_resolution_time
+        hours = settings.SLA_PRIORITY_HOURS[self.priority]
+        category = reference_caches['category'].get().by_id.get(self.category_id)
+        if category and category.get('sla_hours'):
+            hours = min(hours, category['sla_hours'])
+        return self.created_at + timedelta(hours=hours)
+    
+    def save(self, *args, **kwargs):
+        self.severity = PRIORITY_SEVERITY.get(self.priority, self.severity)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = update_fields = {*update_fields, 'severity'}
+        sla_inputs = self._sla_inputs()
+        sla_changed = self.due_at is None or sla_inputs != getattr(self, '_saved_sla_inputs', None)
+        if sla_changed and (update_fields is None or SLA_FIELDS & set(update_fields)):
+            due_at = self.compute_due_at()
+            if due_at != self.due_at:
+                self.due_at = due_at
+                if due_at > timezone.now():
+                    self.sla_stage = SLAStageChoices.ON_TRACK
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'due_at', 'sla_stage'}
+        result = super().save(*args, **kwargs)
+        if update_fields is None or SLA_FIELDS & set(update_fields):
+            self._saved_sla_inputs = sla_inputs
+        return result
     
     def __str__(self):
         return f"{self.title} - {self.status}"
     
+class IssueTextBand(models.Model):
+    """One LSH band of an Issue's MinHash signature, for near-duplicate lookup."""
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='text_bands')
+    band = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField()
+    
+    class Meta:
+        unique_together = ('issue', 'band')
+        indexes = [
+            models.Index(fields=['band', 'value'], name='issue_text_band_value_idx'),
+        ]
+    
+
 class IssueImage(models.Model):
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='issue_images/')
+    image = models.ImageField(upload_to='issue_images/', storage=content_storage)
     caption = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=ImageStatusChoices.choices, default=ImageStatusChoices.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    phash = models.CharField(max_length=16, blank=True)
+    thumbnail = models.ImageField(upload_to='issue_images/thumbnails/', storage=content_storage, null=True, blank=True)
+    medium = models.ImageField(upload_to='issue_images/medium/', storage=content_storage, null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'uploaded_at'],
+                name='issueimage_queue_idx',
+                condition=models.Q(status__in=['pending', 'processing', 'failed']),
+            ),
+        ]
     
     def __str__(self):
         return f"Image for {self.issue.title}"
     
 
+class PerceptualHashBand(models.Model):
+    """One 16-bit slice of an IssueImage's 64-bit dHash, for near-duplicate lookup."""
+    image = models.ForeignKey(IssueImage, on_delete=models.CASCADE, related_name='hash_bands')
+    band = models.PositiveSmallIntegerField()
+    value = models.PositiveIntegerField()
+    
+    class Meta:
+        unique_together = ('image', 'band')
+        indexes = [
+            models.Index(fields=['band', 'value'], name='phash_band_value_idx'),
+        ]
+
+
+class StoredFile(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+    
+
 class Upvote(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='upvotes')
@@ -201,6 +335,18 @@ class Upvote(models.Model):
         return f"{self.user.username} upvoted {self.issue.title}"
     
 
+class UpvoteCounterShard(models.Model):
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='upvote_shards')
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('issue', 'shard')
+    
+    def __str__(self):
+        return f"{self.issue_id}[{self.shard}]: {self.delta:+d}"
+    
+
 class Comment(models.Model):
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -213,6 +359,9 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['issue', 'created_at', 'id'], name='comment_issue_created_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.username} on {self.issue.title}"
@@ -236,15 +385,65 @@ class IssueStatusHistory(models.Model):
 
 class Notification(models.Model):
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
-    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_notifications')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_notifications', null=True, blank=True)
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='notifications')
     notification_type = models.CharField(max_length=20, choices=NotificationChoices.choices)
     message = models.TextField()
+    count = models.PositiveIntegerField(default=1)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_unread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Notification for {self.recipient.username}"
+
+class IssueStatusCount(models.Model):
+    """Number of issues currently in each status, per location and category."""
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=StatusChoices.choices)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('location', 'category', 'status')
+    
+    def __str__(self):
+        return f"{self.location_id}/{self.category_id}/{self.status}: {self.count}"
+
+
+class IssueDailyStats(models.Model):
+    """Issues created and resolved per day, location and category."""
+    day = models.DateField()
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    created = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    resolution_seconds = models.BigIntegerField(default=0)
+    sla_tracked = models.IntegerField(default=0)
+    sla_breached = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('day', 'location', 'category')
+    
+    def __str__(self):
+        return f"{self.day} {self.location_id}/{self.category_id}"
+
+
+class AssignmentAffinity(models.Model):
+    """A maintenance staff member's preference for a category and/or location when issues are auto-assigned."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assignment_affinities')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    weight = models.FloatField(default=1.0)
+    
+    class Meta:
+        verbose_name_plural = "Assignment Affinities"
     
     def __str__(self):
-        return f"Notification for {self.recipient.username}"
\ No newline at end of file
+        return f"{self.user_id}: category={self.category_id} location={self.location_id} x{self.weight}"
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+from .choices import NotificationChoices, PriorityChoices, RoleChoices, StatusChoices
+from .models import Comment, Issue, Notification, Upvote, User
+from .realtime import publish_inbox_event
+from .workers import submit_after_commit
+
+# Bursts of these collapse into the recipient's existing unread notification.
+COALESCED_MESSAGES = {
+    NotificationChoices.UPVOTE_RECEIVED: ' people upvoted "{title}"',
+    NotificationChoices.COMMENT_ADDED: ' new comments on "{title}"',
+}
+
+
+def _message(notification_type, issue, sender_name, extra):
+    if notification_type == NotificationChoices.ISSUE_CREATED:
+        return f'New issue reported: "{issue.title}"'
+    if notification_type == NotificationChoices.COMMENT_ADDED:
+        return f'{sender_name} commented on "{issue.title}"'
+    if notification_type == NotificationChoices.UPVOTE_RECEIVED:
+        return f'{sender_name} upvoted "{issue.title}"'
+    if notification_type == NotificationChoices.ASSIGNMENT_CHANGED:
+        return f'"{issue.title}" was assigned to you'
+    if notification_type == NotificationChoices.SLA_WARNING:
+        return f'"{issue.title}" is due {timezone.localtime(issue.due_at):%Y-%m-%d %H:%M}'
+    if notification_type == NotificationChoices.SLA_BREACHED:
+        return f'"{issue.title}" is past its SLA and was escalated to {PriorityChoices(issue.priority).label}'
+    return f'"{issue.title}" is now {StatusChoices(extra.get("status", issue.status)).label}'
+
+
+def _recipients(notification_type, issue):
+    recipients = set()
+    if notification_type in (NotificationChoices.ASSIGNMENT_CHANGED, NotificationChoices.SLA_WARNING):
+        recipients.add(issue.assigned_to_id)
+    elif notification_type == NotificationChoices.SLA_BREACHED:
+        recipients.add(issue.assigned_to_id)
+        recipients.update(User.objects.filter(role=RoleChoices.ADMIN, is_active=True).values_list('pk', flat=True))
+    elif notification_type == NotificationChoices.ISSUE_CREATED:
+        recipients.add(issue.assigned_to_id)
+    else:
+        recipients.update([issue.reporter_id, issue.assigned_to_id])
+    if notification_type in (NotificationChoices.COMMENT_ADDED, NotificationChoices.ISSUE_UPDATED):
+        recipients.update(Comment.objects.filter(issue=issue).values_list('author_id', flat=True).distinct())
+    if notification_type == NotificationChoices.ISSUE_UPDATED:
+        recipients.update(Upvote.objects.filter(issue=issue).values_list('user_id', flat=True))
+    recipients.discard(None)
+    return recipients
+
+
+def fan_out(notification_type, issue_id, sender_id, extra=None):
+    """Work out who hears about an event and write their notifications in bulk."""
+    issue = Issue.objects.filter(pk=issue_id).first()
+    if issue is None:
+        return 0
+    recipients = _recipients(notification_type, issue)
+    recipients.discard(sender_id)
+    if not recipients:
+        return 0
+
+    coalesced = set()
+    if notification_type in COALESCED_MESSAGES:
+        existing = Notification.objects.filter(
+            issue=issue, notification_type=notification_type, is_read=False, recipient_id__in=recipients
+        )
+        coalesced = set(existing.values_list('recipient_id', flat=True))
+        existing.update(
+            count=F('count') + 1,
+            sender_id=sender_id,
+            created_at=timezone.now(),
+            message=Concat(
+                Cast(F('count') + 1, CharField()),
+                Value(COALESCED_MESSAGES[notification_type].format(title=issue.title)),
+            ),
+        )
+
+    sender_name = User.objects.filter(pk=sender_id).values_list('username', flat=True).first() if sender_id else None
+    message = _message(notification_type, issue, sender_name, extra or {})
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                recipient_id=recipient_id,
+                sender_id=sender_id,
+                issue=issue,
+                notification_type=notification_type,
+                message=message,
+            )
+            for recipient_id in recipients - coalesced
+        ],
+        batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    )
+    publish_inbox_event(recipients, {'type': 'notification', 'issue': issue.pk, 'notification_type': notification_type})
+    return len(recipients)
+
+
+def notify(notification_type, issue, sender, **extra):
+    """
+    Queue a fan-out for after the current transaction; never blocks the
+    request. ``sender`` is None for system events such as SLA escalation.
+    """
+    submit_after_commit(
+        'notifications', settings.NOTIFICATION_WORKERS, fan_out,
+        notification_type, issue.pk, sender.pk if sender else None, extra,
+    )
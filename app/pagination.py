@@ -0,0 +1,34 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id) for the issue, comment and
+    notification feeds. Pass ``?skip_count=true`` to drop the total count so
+    every page costs the same as the first one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    skip_count_query_param = 'skip_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.skip_count_query_param, '').lower() not in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+
+class CommentCursorPagination(FeedCursorPagination):
+    ordering = ('created_at', 'id')
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = 'unifix_events'
+PG_PAYLOAD_LIMIT = 7900
+
+
+class Subscription:
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.REALTIME_QUEUE_SIZE)
+
+    def deliver(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """
+    In-process pub/sub that hands events to subscribers on their own event
+    loops. Publishing goes through a backplane so that every server process
+    sees every event: ``local`` dispatches straight into this process, and
+    ``postgres`` fans out through LISTEN/NOTIFY.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._listener = None
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        if settings.REALTIME_BACKPLANE == 'postgres':
+            self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def dispatch(self, channels, event):
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscribers.get(channel, ()))
+        for subscription in targets:
+            if subscription.loop.is_closed():
+                self.unsubscribe(subscription)
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The loop closed after the check above.
+                self.unsubscribe(subscription)
+
+    def publish(self, channels, event):
+        """Publish once the current transaction commits (immediately outside one)."""
+        channels = list(channels)
+        if settings.REALTIME_BACKPLANE != 'postgres':
+            # robust: a failed dispatch must never fail a write that already committed.
+            transaction.on_commit(lambda: self.dispatch(channels, event), robust=True)
+            return
+        # NOTIFY is transactional, so it is delivered on commit by itself.
+        with connection.cursor() as cursor:
+            for payload in _pg_payloads(channels, event):
+                cursor.execute('SELECT pg_notify(%s, %s)', [PG_CHANNEL, payload])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='realtime-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg
+        params = connection.get_connection_params()
+        while True:
+            try:
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f'LISTEN {PG_CHANNEL}')
+                    for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self.dispatch(message['channels'], message['event'])
+            except Exception:
+                logger.exception("Realtime listener lost its connection; reconnecting")
+                time.sleep(1)
+
+
+def _pg_payloads(channels, event):
+    """Split a publish into NOTIFY payloads that fit under Postgres' 8000-byte limit."""
+    base = len(json.dumps({'channels': [], 'event': event}))
+    batch, size = [], base
+    for channel in channels:
+        channel_size = len(json.dumps(channel)) + 2
+        if batch and size + channel_size > PG_PAYLOAD_LIMIT:
+            yield json.dumps({'channels': batch, 'event': event})
+            batch, size = [], base
+        batch.append(channel)
+        size += channel_size
+    if batch:
+        yield json.dumps({'channels': batch, 'event': event})
+
+
+broker = Broker()
+
+
+def publish_issue_event(issue, event_type, **data):
+    broker.publish(
+        [f'issue:{issue.pk}', f'location:{issue.location_id}'],
+        {'type': event_type, 'issue': issue.pk, **data},
+    )
+
+
+def publish_inbox_event(recipient_ids, event):
+    broker.publish([f'user:{recipient_id}' for recipient_id in recipient_ids], event)
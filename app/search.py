@@ -0,0 +1,21 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+
+SEARCH_CONFIG = 'english'
+
+
+def search_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def issue_search_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset):
+    if not search_enabled():
+        return 0
+    return queryset.update(search_vector=issue_search_vector())
@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from .cache import reference_caches
+from .images import enqueue_image
 from .models import *
+from .choices import ImageStatusChoices, StatusChoices
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -43,15 +46,41 @@ class LocationSerializer(serializers.ModelSerializer):
         model = Location
         fields = '__all__'
 
+class CachedReferenceField(serializers.Field):
+    """Embeds a Category/Location from the reference cache instead of a join."""
+    
+    def __init__(self, cache_name, **kwargs):
+        self.cache_name = cache_name
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        if not hasattr(self, '_rows'):
+            self._rows = reference_caches[self.cache_name].get().by_id
+        row = self._rows.get(value)
+        if row is None:
+            self._rows = reference_caches[self.cache_name].get().by_id
+            row = self._rows.get(value)
+        return row
+
+
 class IssueImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = IssueImage
-        fields = ['id', 'image', 'caption']
+        fields = ['id', 'image', 'caption', 'status', 'width', 'height', 'thumbnail', 'medium']
+        read_only_fields = ['status', 'width', 'height', 'thumbnail', 'medium']
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.status != ImageStatusChoices.READY:
+            # Until processing strips its EXIF the original may still carry GPS tags.
+            data['image'] = None
+        return data
 
 class IssueListSerializer(serializers.ModelSerializer):
     reporter = UserSerializer(read_only=True)
-    category = CategorySerializer(read_only=True)
-    location = LocationSerializer(read_only=True)
+    category = CachedReferenceField('category', source='category_id')
+    location = CachedReferenceField('location', source='location_id')
     is_upvoted = serializers.SerializerMethodField()
     
     class Meta:
@@ -60,7 +89,15 @@ class IssueListSerializer(serializers.ModelSerializer):
                  'location', 'priority', 'status', 'upvotes_count', 
                  'comments_count', 'created_at', 'is_upvoted']
     
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'search_headline'):
+            data['search_headline'] = instance.search_headline
+        return data
+    
     def get_is_upvoted(self, obj):
+        if hasattr(obj, 'is_upvoted'):
+            return obj.is_upvoted
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.upvotes.filter(user=request.user).exists()
@@ -68,17 +105,19 @@ class IssueListSerializer(serializers.ModelSerializer):
 
 class IssueDetailSerializer(serializers.ModelSerializer):
     reporter = UserSerializer(read_only=True)
-    category = CategorySerializer(read_only=True)
-    location = LocationSerializer(read_only=True)
+    category = CachedReferenceField('category', source='category_id')
+    location = CachedReferenceField('location', source='location_id')
     assigned_to = UserSerializer(read_only=True)
     images = IssueImageSerializer(many=True, read_only=True)
     is_upvoted = serializers.SerializerMethodField()
     
     class Meta:
         model = Issue
-        fields = '__all__'
+        exclude = ['search_vector', 'severity', 'minhash', 'sla_stage']
     
     def get_is_upvoted(self, obj):
+        if hasattr(obj, 'is_upvoted'):
+            return obj.is_upvoted
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.upvotes.filter(user=request.user).exists()
@@ -100,7 +139,7 @@ class IssueCreateSerializer(serializers.ModelSerializer):
         images_data = validated_data.pop('images', [])
         issue = Issue.objects.create(**validated_data)
         for image_data in images_data:
-            IssueImage.objects.create(issue=issue, image=image_data)
+            enqueue_image(IssueImage.objects.create(issue=issue, image=image_data).pk)
         return issue
     
     class Meta:
@@ -120,7 +159,7 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
                 setattr(instance, attr, value)
             instance.save()
             for image_data in images_data:
-                IssueImage.objects.create(issue=instance, image=image_data)
+                enqueue_image(IssueImage.objects.create(issue=instance, image=image_data).pk)
             return instance
         class Meta:
             model = Issue
@@ -129,6 +168,12 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
 
     
 
+class BulkStatusUpdateSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=StatusChoices.choices)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
@@ -140,9 +185,26 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_at', 'updated_at', 'is_edited']
     
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return CommentSerializer(obj.replies.all(), many=True, context=self.context).data
-        return []
+        # Filled in one query by comments.reply_trees; a new comment has none.
+        return self.context.get('reply_trees', {}).get(obj.pk, [])
+
+
+class CommentNodeSerializer(serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = Comment
+        fields = ['id', 'content', 'issue', 'author', 'parent', 'created_at', 
+                 'updated_at', 'is_edited']
+
+class NotificationSerializer(serializers.ModelSerializer):
+    sender = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = Notification
+        fields = ['id', 'sender', 'issue', 'notification_type', 'message', 'count', 'is_read', 'created_at']
+        read_only_fields = fields
+
 
 class UpvoteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .assignment import assignee_cache
+from .authentication import invalidate_cached_user
+from .cache import reference_caches
+from .counters import apply_comment_delta, apply_upvote_delta
+from .duplicates import index_issues
+from .models import AssignmentAffinity, Category, Comment, Issue, IssueImage, Location, Upvote, User
+from .search import update_search_vectors
+
+
+@receiver(post_save, sender=Issue)
+def refresh_issue_text_indexes(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    update_search_vectors(Issue.objects.filter(pk=instance.pk))
+    index_issues([instance])
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    transaction.on_commit(reference_caches['category'].invalidate)
+
+
+@receiver([post_save, post_delete], sender=Location)
+def invalidate_location_cache(sender, **kwargs):
+    transaction.on_commit(reference_caches['location'].invalidate)
+
+
+@receiver([post_save, post_delete], sender=AssignmentAffinity)
+def invalidate_assignee_cache(sender, **kwargs):
+    transaction.on_commit(assignee_cache.invalidate)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_assignee_cache_for_user(sender, update_fields=None, **kwargs):
+    if update_fields is not None and not {'role', 'is_active'} & set(update_fields):
+        return
+    transaction.on_commit(assignee_cache.invalidate)
+
+
+@receiver(post_delete, sender=IssueImage)
+def release_issue_image_files(sender, instance, **kwargs):
+    for field in (instance.image, instance.thumbnail, instance.medium):
+        if field:
+            field.delete(save=False)
+
+
+@receiver(post_delete, sender=User)
+def release_profile_picture(sender, instance, **kwargs):
+    if instance.profile_picture:
+        instance.profile_picture.delete(save=False)
+
+
+@receiver(pre_save, sender=User)
+def remember_profile_picture(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'profile_picture' not in update_fields):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list('profile_picture', flat=True).first()
+    # A pending upload is stored (and referenced) during save, even when its
+    # content, and so its name, matches the old picture.
+    if old and (old != instance.profile_picture.name or not instance.profile_picture._committed):
+        instance._replaced_profile_picture = old
+
+
+@receiver(post_save, sender=User)
+def release_replaced_profile_picture(sender, instance, **kwargs):
+    old = instance.__dict__.pop('_replaced_profile_picture', None)
+    if old:
+        instance.profile_picture.storage.delete(old)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_comment_delta(instance.issue_id, 1)
+
+
+@receiver(pre_delete, sender=Issue)
+def mark_issue_deleting(sender, instance, origin=None, **kwargs):
+    """
+    Django sends pre_delete for every collected row before deleting any, so
+    record on the cascade's origin which issues are going. Comments and
+    upvotes removed on the way, whether the delete started at the issue or at
+    its reporter, category or location, then leave the counters alone.
+    """
+    if origin is None:
+        return
+    if not hasattr(origin, '_deleting_issue_ids'):
+        origin._deleting_issue_ids = set()
+    origin._deleting_issue_ids.add(instance.pk)
+
+
+def _deleting_issue(instance, origin):
+    return instance.issue_id in getattr(origin, '_deleting_issue_ids', ())
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not _deleting_issue(instance, origin):
+        apply_comment_delta(instance.issue_id, -1)
+
+
+@receiver(post_save, sender=Upvote)
+def count_new_upvote(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_upvote_delta(instance.issue_id, 1)
+
+
+@receiver(post_delete, sender=Upvote)
+def count_deleted_upvote(sender, instance, origin=None, **kwargs):
+    if not _deleting_issue(instance, origin):
+        apply_upvote_delta(instance.issue_id, -1)
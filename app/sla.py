@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .choices import OPEN_STATUSES, PRIORITY_SEVERITY, NotificationChoices, PriorityChoices, SLAStageChoices
+from .models import Issue
+from .notifications import notify
+from .realtime import publish_issue_event
+
+ESCALATION = {
+    PriorityChoices.LOW: PriorityChoices.MEDIUM,
+    PriorityChoices.MEDIUM: PriorityChoices.HIGH,
+    PriorityChoices.HIGH: PriorityChoices.CRITICAL,
+    PriorityChoices.CRITICAL: PriorityChoices.CRITICAL,
+}
+
+
+def _due_batch(stages, due_before, batch_size, due_after=None):
+    """
+    Open issues due by ``due_before`` that are still in one of ``stages``,
+    earliest first. Walks issue_sla_queue_idx, so the cost follows the
+    number of due issues, not the size of the backlog.
+    """
+    return list(
+        Issue.objects.select_for_update(skip_locked=True, of=('self',))
+        .filter(status__in=OPEN_STATUSES, due_at__lte=due_before, sla_stage__in=stages)
+        .filter(**({'due_at__gt': due_after} if due_after else {}))
+        .order_by('due_at')[:batch_size]
+    )
+
+
+def warn_upcoming(now, batch_size):
+    """Tell assignees about issues due within SLA_WARNING_MINUTES. Returns how many were warned."""
+    with transaction.atomic():
+        warn_before = now + timedelta(minutes=settings.SLA_WARNING_MINUTES)
+        issues = _due_batch([SLAStageChoices.ON_TRACK], warn_before, batch_size, due_after=now)
+        Issue.objects.filter(pk__in=[issue.pk for issue in issues]).update(sla_stage=SLAStageChoices.WARNED)
+        for issue in issues:
+            notify(NotificationChoices.SLA_WARNING, issue, None)
+    return len(issues)
+
+
+def escalate_breached(now, batch_size):
+    """Raise the priority of issues past their deadline and notify. Returns how many were escalated."""
+    with transaction.atomic():
+        issues = _due_batch([SLAStageChoices.ON_TRACK, SLAStageChoices.WARNED], now, batch_size)
+        for issue in issues:
+            issue.priority = ESCALATION[issue.priority]
+            issue.severity = PRIORITY_SEVERITY[issue.priority]
+            issue.sla_stage = SLAStageChoices.BREACHED
+            issue.updated_at = now
+        # bulk_update keeps due_at: escalation must not restart the clock.
+        Issue.objects.bulk_update(issues, ['priority', 'severity', 'sla_stage', 'updated_at'])
+        for issue in issues:
+            notify(NotificationChoices.SLA_BREACHED, issue, None)
+            transaction.on_commit(lambda issue=issue: publish_issue_event(issue, 'escalated', priority=issue.priority))
+    return len(issues)
+
+
+def run_tick(batch_size=None):
+    """
+    Process every issue that is due, one batch per transaction. Returns
+    ``(warned, escalated)``.
+    """
+    batch_size = batch_size or settings.SLA_BATCH_SIZE
+    now = timezone.now()
+    escalated = warned = 0
+    while True:
+        count = escalate_breached(now, batch_size)
+        escalated += count
+        if count < batch_size:
+            break
+    while True:
+        count = warn_upcoming(now, batch_size)
+        warned += count
+        if count < batch_size:
+            break
+    return warned, escalated
+
+
+def backfill_due_dates(batch_size=None):
+    """Set due_at on open issues that have none. Returns how many were filled."""
+    batch_size = batch_size or settings.SLA_BATCH_SIZE
+    filled = 0
+    while True:
+        with transaction.atomic():
+            issues = list(
+                Issue.objects.select_for_update()
+                .filter(status__in=OPEN_STATUSES, due_at__isnull=True)
+                .order_by('pk')[:batch_size]
+            )
+            for issue in issues:
+                issue.due_at = issue.compute_due_at()
+            Issue.objects.bulk_update(issues, ['due_at'])
+        filled += len(issues)
+        if len(issues) < batch_size:
+            return filled
+
+
+@contextmanager
+def leader_lock():
+    """
+    Yield a callable that reports whether this process is the SLA leader.
+    On PostgreSQL leadership is a session advisory lock on SLA_LOCK_ID, so
+    only one worker escalates at a time and a standby takes over when the
+    leader's connection goes away. Other databases have no such lock; there
+    every worker is the leader, so run just one.
+    """
+    if connection.vendor != 'postgresql':
+        yield lambda: True
+        return
+    held = False
+
+    def is_leader():
+        nonlocal held
+        if not held:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [settings.SLA_LOCK_ID])
+                held = cursor.fetchone()[0]
+        return held
+
+    try:
+        yield is_leader
+    finally:
+        if held and connection.connection is not None:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [settings.SLA_LOCK_ID])
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import posixpath
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, named by the SHA-256 of its content under
+    the field's ``upload_to`` directory. A StoredFile row counts how many
+    model fields point at a name; the file is removed once the transaction
+    that dropped the last one commits.
+    """
+    chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        digest = getattr(content, 'sha256', None)
+        if digest is None:
+            hasher = hashlib.sha256()
+            for chunk in content.chunks(self.chunk_size):
+                hasher.update(chunk)
+            content.seek(0)
+            digest = hasher.hexdigest()
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        # Reference the name before looking for the file, so a delete of the
+        # same content committing meanwhile sees the reference and keeps it.
+        self.retain(name)
+        if not self.exists(name):
+            saved = super()._save(name, content)
+            if saved != name:
+                # Another request wrote the same content first.
+                super().delete(saved)
+        return name
+
+    def retain(self, name):
+        StoredFile = apps.get_model('app', 'StoredFile')
+        if StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, refcount=1)
+        except IntegrityError:
+            StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def delete(self, name):
+        StoredFile = apps.get_model('app', 'StoredFile')
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is not None and stored.refcount > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=F('refcount') - 1)
+                return
+            if stored is not None:
+                stored.delete()
+        transaction.on_commit(lambda: self._purge(name))
+
+    def _purge(self, name):
+        """
+        Remove the file once the last reference is gone for good. A StoredFile
+        row for the name is inserted while the file is deleted, so a concurrent
+        ``retain`` of the same content either waits for the purge and then
+        rewrites the file, or got there first and the purge keeps it.
+        """
+        StoredFile = apps.get_model('app', 'StoredFile')
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, refcount=0)
+                super().delete(name)
+                StoredFile.objects.filter(name=name, refcount=0).delete()
+        except IntegrityError:
+            pass
+
+
+content_storage = ContentAddressedStorage()
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    """Hashes small uploads as they arrive so storage never re-reads them."""
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.activated:
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    """Hashes large uploads while they stream to the temporary file."""
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
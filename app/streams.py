@@ -0,0 +1,57 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from .authentication import authenticate_jwt
+from .realtime import broker
+
+
+def _channels(request, user):
+    channels = []
+    for name in ('issue', 'location'):
+        for value in request.GET.getlist(name):
+            if value.isdigit():
+                channels.append(f'{name}:{value}')
+    if request.GET.get('inbox', '').lower() in ('1', 'true', 'yes'):
+        channels.append(f'user:{user.pk}')
+    return channels
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events feed of issue status changes, comments, upvotes and
+    inbox notifications. Subscribe with ``?issue=<id>``, ``?location=<id>``
+    (both repeatable) and ``?inbox=true``. Needs the ASGI application.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the subscription's loop dies with the request and the
+        # endless stream would pin a worker thread.
+        return JsonResponse({'error': 'Event streams need the ASGI server (WEB_SERVER=asgi)'}, status=501)
+    user = await sync_to_async(authenticate_jwt)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    channels = _channels(request, user)
+    if not channels:
+        return JsonResponse({'error': 'Subscribe to at least one issue, location or inbox'}, status=400)
+
+    subscription = broker.subscribe(channels)
+
+    async def events():
+        try:
+            yield f'retry: {settings.REALTIME_RETRY_MS}\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=settings.REALTIME_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
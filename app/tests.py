@@ -1,3 +1,96 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.test import APIClient
+from app.models import Category, Comment, Issue, IssueImage, Location, Upvote, UpvoteCounterShard, User
 
-# Create your tests here.
+
+class IssueQueryCountTests(TestCase):
+    """The issue list and detail must cost the same number of queries however much they return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='viewer', email='viewer@example.com', role='admin')
+        reporters = [
+            User.objects.create_user(username=f'reporter{n}', email=f'reporter{n}@example.com', role='student')
+            for n in range(5)
+        ]
+        categories = [Category.objects.create(name=f'Category {n}', is_active=True) for n in range(3)]
+        locations = [Location.objects.create(name=f'Location {n}', location_type='lab') for n in range(3)]
+        cls.issues = [
+            Issue.objects.create(
+                title=f'Issue {n}', description='The light is broken', reporter=reporters[n % 5],
+                category=categories[n % 3], location=locations[n % 3], assigned_to=reporters[(n + 1) % 5],
+            )
+            for n in range(10)
+        ]
+        for issue in cls.issues[1:]:
+            Upvote.objects.create(issue=issue, user=cls.user)
+        busy = cls.issues[-1]
+        for n in range(5):
+            IssueImage.objects.create(issue=busy, image=f'issue_images/{n}.jpg')
+            Comment.objects.create(issue=busy, author=reporters[n], content=f'Comment {n}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        single = self.queries('/issues/?page_size=1')
+        with self.assertNumQueries(single):
+            response = self.client.get('/issues/?page_size=10')
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_compact_list_query_count_is_constant(self):
+        single = self.queries('/issues/?view=compact&page_size=1')
+        with self.assertNumQueries(single):
+            self.client.get('/issues/?view=compact&page_size=10')
+
+    def test_detail_query_count_is_constant(self):
+        plain = self.queries(f'/issues/{self.issues[0].pk}/')
+        with self.assertNumQueries(plain):
+            response = self.client.get(f'/issues/{self.issues[-1].pk}/')
+        self.assertEqual(len(response.data['images']), 5)
+
+
+@override_settings(UPVOTE_COUNTER_SHARDS=4)
+class CascadeCounterTests(TestCase):
+    """Deletes that cascade through an issue must not write counter deltas for it."""
+
+    def setUp(self):
+        self.reporter = User.objects.create_user(username='reporter', email='reporter@example.com')
+        self.voter = User.objects.create_user(username='voter', email='voter@example.com')
+        self.category = Category.objects.create(name='Plumbing')
+        location = Location.objects.create(name='Hall', location_type='building')
+        self.issue = Issue.objects.create(title='Leak', description='Tap drips', reporter=self.reporter,
+                                          category=self.category, location=location)
+        Upvote.objects.create(issue=self.issue, user=self.voter)
+        Comment.objects.create(issue=self.issue, author=self.voter, content='Still dripping')
+        UpvoteCounterShard.objects.all().delete()
+
+    def assert_issue_gone_cleanly(self):
+        self.assertFalse(Issue.objects.filter(pk=self.issue.pk).exists())
+        self.assertFalse(UpvoteCounterShard.objects.exists())
+        connection.check_constraints()
+
+    def test_deleting_reporter(self):
+        self.reporter.delete()
+        self.assert_issue_gone_cleanly()
+
+    def test_deleting_category(self):
+        self.category.delete()
+        self.assert_issue_gone_cleanly()
+
+    def test_deleting_voter_still_counts(self):
+        self.voter.delete()
+        self.assertEqual(sum(UpvoteCounterShard.objects.values_list('delta', flat=True)), -1)
+        self.assertEqual(Issue.objects.get(pk=self.issue.pk).comments_count, 0)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
-from . import views
+from . import async_views, streams, views
 
 router = DefaultRouter()
 
@@ -9,8 +9,16 @@ router.register(r'issues', views.IssueViewSet, basename='issue')
 router.register(r'comments', views.CommentViewSet, basename='comment')
 router.register(r'categories', views.CategoryViewSet, basename='category')
 router.register(r'locations', views.LocationViewSet, basename='location')
+router.register(r'notifications', views.NotificationViewSet, basename='notification')
+router.register(r'analytics', views.AnalyticsViewSet, basename='analytics')
 router.register(r'auth', views.AuthViewSet, basename='auth')
 
 urlpatterns = [
+      path('stream/', streams.event_stream, name='event-stream'),
+      path('async/issues/', async_views.issue_list, name='async-issue-list'),
+      path('async/issues/<int:pk>/', async_views.issue_detail, name='async-issue-detail'),
+      path('async/issues/<int:pk>/comments/', async_views.issue_comments, name='async-issue-comments'),
+      path('async/categories/', async_views.category_list, name='async-category-list'),
+      path('async/locations/', async_views.location_list, name='async-location-list'),
       path('', include(router.urls)),
 ]
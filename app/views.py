@@ -6,30 +6,58 @@ from rest_framework.response import Response
 from django.contrib.auth import authenticate
 from rest_framework import filters
 from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Sum
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 from django_filters.rest_framework import DjangoFilterBackend
-from .serializers import UserRegistrationSerializer ,UserSerializer, IssueCreateSerializer, IssueDetailSerializer, IssueListSerializer, CategorySerializer, LocationSerializer, CommentSerializer, IssueUpdateSerializer
-from app.models import Issue, Comment, Location, Category
+from django.conf import settings
+from .serializers import UserRegistrationSerializer ,UserSerializer, IssueCreateSerializer, IssueDetailSerializer, IssueListSerializer, CategorySerializer, LocationSerializer, CommentSerializer, IssueUpdateSerializer, CommentNodeSerializer, BulkStatusUpdateSerializer, NotificationSerializer
+from app.models import Issue, Comment, Location, Category, Notification, IssueStatusCount, IssueDailyStats
 from django.contrib.auth import authenticate
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import AuthToken, Upvote, IssueStatusHistory
-from rest_framework_simplejwt.views import TokenRefreshView
-from .choices import StatusChoices
+from .choices import StatusChoices, NotificationChoices, PRIORITY_SEVERITY, OPEN_STATUSES
+from .pagination import FeedCursorPagination, CommentCursorPagination
+from .comments import build_comment_tree, reply_trees
+from .cache import reference_caches
+from .conditional import etag_matches, issue_etag, not_modified
+from .search import update_search_vectors
+from .duplicates import find_duplicates, index_issues, upload_phashes
+from .notifications import notify
+from .realtime import publish_issue_event
+from .filters import IssueFilter, IssueSearchFilter, IssueOrderingFilter
+from .compact import compact_issue_rows, compact_page
+from .exports import EXPORT_FORMATS, export_issues, gzip_stream
+from .analytics import issue_snapshot, record_issue_changes
+from .assignment import auto_assign, auto_assignee, track_workload
+from .authentication import issue_device_tokens, mark_device_revoked, parse_device_id, rotate_refresh_token, token_device_id
+
+
+def issue_queryset(user):
+    queryset = Issue.objects.select_related('reporter', 'assigned_to')
+    if user.is_authenticated:
+        queryset = queryset.annotate(
+            is_upvoted=Exists(Upvote.objects.filter(issue=OuterRef('pk'), user=user))
+        )
+    return queryset
+
+
+def record_changes(changes):
+    changes = list(changes)
+    record_issue_changes(changes)
+    track_workload(changes)
 
 
 class AuthViewSet(viewsets.ViewSet):
     def get_tokens_for_user(self, user, device_id):
-        refresh = RefreshToken.for_user(user)
-        refresh['device_id'] = str(device_id)
-        refresh['username'] = user.username
-        refresh['role'] = user.role
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        }
+        return issue_device_tokens(user, device_id)
     
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
@@ -58,13 +86,11 @@ class AuthViewSet(viewsets.ViewSet):
                 {'error': 'device_id is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if parse_device_id(device_id) is None:
+            return Response({'error': 'device_id must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
         
         user = authenticate(username=username, password=password)
         if user:
-            token_obj, created = AuthToken.objects.get_or_create(
-                user=user,
-                device_id=device_id
-            )
             tokens = self.get_tokens_for_user(user, device_id)
             return Response({
                 'user': UserSerializer(user).data,
@@ -79,18 +105,22 @@ class AuthViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def logout(self, request):
         try:
-            refresh_token = request.data.get('refresh_token')
-            if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+            device_id = token_device_id(request.auth) if request.auth else None
+            if device_id and AuthToken.objects.filter(user=request.user, device_id=device_id).update(status=False, key=None):
+                mark_device_revoked(request.user.pk, device_id)
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def refresh(self, request):
-        refresh_view = TokenRefreshView.as_view()
-        return refresh_view(request._request)
+        refresh_token = request.data.get('refresh')
+        if not refresh_token:
+            return Response({'error': 'refresh is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(rotate_refresh_token(refresh_token))
+        except (TokenError, AuthenticationFailed) as e:
+            return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
     
 
 
@@ -116,6 +146,7 @@ class AuthViewSet(viewsets.ViewSet):
             token = AuthToken.objects.get(user=request.user, device_id=device_id)
             token.status = False
             token.save()
+            mark_device_revoked(request.user.pk, token.device_id)
             return Response({'message': 'Device revoked successfully'})
         except AuthToken.DoesNotExist:
             return Response({'error': 'Device not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -123,11 +154,17 @@ class AuthViewSet(viewsets.ViewSet):
 class IssueViewSet(viewsets.ModelViewSet):
     queryset = Issue.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'category', 'location']
+    pagination_class = FeedCursorPagination
+    filter_backends = [DjangoFilterBackend, IssueSearchFilter, IssueOrderingFilter]
+    filterset_class = IssueFilter
     search_fields = ['title', 'description']
-    ordering_fields = ['created_at', 'upvotes_count', 'priority']
+    ordering_fields = ['created_at', 'upvotes_count', 'priority', 'search_rank']
+    
+    def get_queryset(self):
+        queryset = issue_queryset(self.request.user)
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('images')
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -138,24 +175,123 @@ class IssueViewSet(viewsets.ModelViewSet):
             return IssueListSerializer
         return IssueDetailSerializer
     
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('view') == 'compact':
+            return self._compact_list(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return super().list(request, *args, **kwargs)
+        etag = issue_etag(request, page, self.paginator.count, self.paginator.get_next_link(),
+                          self.paginator.get_previous_link())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response['ETag'] = etag
+        return response
+    
+    def _compact_list(self, request):
+        page = self.paginate_queryset(compact_issue_rows(self.filter_queryset(self.get_queryset())))
+        etag = issue_etag(request, page, 'compact', self.paginator.count, self.paginator.get_next_link(),
+                          self.paginator.get_previous_link())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        results, included = compact_page(page, request)
+        response = self.get_paginated_response(results)
+        response.data['included'] = included
+        response['ETag'] = etag
+        return response
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = issue_etag(request, [instance], *[f'{image.pk}:{image.status}' for image in instance.images.all()])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        return response
+    
+    def _duplicates_payload(self, matches):
+        issues = Issue.objects.in_bulk([issue_id for issue_id, _ in matches])
+        return [
+            {'id': issue_id, 'title': issues[issue_id].title, 'status': issues[issue_id].status, 'score': round(score, 3)}
+            for issue_id, score in matches if issue_id in issues
+        ]
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        phashes = upload_phashes(serializer.validated_data.get('images', []))
+        self.perform_create(serializer)
+        data = dict(serializer.data)
+        data['possible_duplicates'] = self._duplicates_payload(find_duplicates(serializer.instance, phashes))
+        headers = self.get_success_headers(serializer.data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+    
     def perform_create(self, serializer):
-        serializer.save(reporter=self.request.user)
+        with transaction.atomic():
+            category, location = serializer.validated_data.get('category'), serializer.validated_data.get('location')
+            assignee = auto_assignee(getattr(category, 'pk', None), getattr(location, 'pk', None))
+            issue = serializer.save(reporter=self.request.user, assigned_to_id=assignee)
+            record_changes([(None, issue_snapshot(issue))])
+        notify(NotificationChoices.ISSUE_CREATED, issue, self.request.user)
+    
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Snapshot the locked row so concurrent updates cannot both subtract the same old state.
+            serializer.instance = Issue.objects.select_for_update().get(pk=serializer.instance.pk)
+            before = issue_snapshot(serializer.instance)
+            issue = serializer.save()
+            record_changes([(before, issue_snapshot(issue))])
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            record_changes([(issue_snapshot(instance), None)])
+            instance.delete()
+    
+    @action(detail=True, methods=['get'])
+    def duplicates(self, request, pk=None):
+        """Open issues at the same location that look like the same report"""
+        issue = self.get_object()
+        return Response({'results': self._duplicates_payload(find_duplicates(issue))})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching issue with its status history as CSV or JSON Lines (?file_format=, ?gzip=1)"""
+        if request.user.role not in ['admin', 'staff']:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'file_format must be one of {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, filename = EXPORT_FORMATS[file_format][0], f'issues.{EXPORT_FORMATS[file_format][1]}'
+        chunks = export_issues(self.filter_queryset(Issue.objects.all()), file_format, settings.EXPORT_CHUNK_SIZE)
+        if request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes'):
+            chunks, content_type, filename = gzip_stream(chunks), 'application/gzip', f'{filename}.gz'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
     
     @action(detail=True, methods=['post'])
     def upvote(self, request, pk=None):
         issue = self.get_object()
-        upvote, created = Upvote.objects.get_or_create(
-            user=request.user, 
-            issue=issue
-        )
-        if created:
-            issue.upvotes_count += 1
-            issue.save()
-            return Response({'message': 'Issue upvoted'})
-        else:
+        with transaction.atomic():
+            # The row lock serialises concurrent toggles, so each one is counted once.
+            upvote, created = Upvote.objects.select_for_update().get_or_create(
+                user=request.user, 
+                issue=issue
+            )
+            if created:
+                notify(NotificationChoices.UPVOTE_RECEIVED, issue, request.user)
+                publish_issue_event(issue, 'upvote', delta=1)
+                return Response({'message': 'Issue upvoted'})
             upvote.delete()
-            issue.upvotes_count -= 1
-            issue.save()
+            publish_issue_event(issue, 'upvote', delta=-1)
             return Response({'message': 'Upvote removed'})
     
     @action(detail=True, methods=['post'])
@@ -164,12 +300,44 @@ class IssueViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
             comment = serializer.save(author=request.user, issue=issue)
-            issue.comments_count += 1
-            issue.save()
+            notify(NotificationChoices.COMMENT_ADDED, issue, request.user)
+            publish_issue_event(issue, 'comment_added', comment=comment.pk, parent=comment.parent_id)
             return Response(CommentSerializer(comment).data, 
                           status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk=None):
+        """Whole comment thread of an issue, loaded in one query"""
+        issue = self.get_object()
+        try:
+            max_depth = min(int(request.query_params.get('max_depth', settings.COMMENT_TREE_MAX_DEPTH)),
+                            settings.COMMENT_TREE_MAX_DEPTH)
+            limit = min(int(request.query_params.get('limit', settings.COMMENT_TREE_MAX_SIZE)),
+                        settings.COMMENT_TREE_MAX_SIZE)
+        except ValueError:
+            return Response(
+                {'error': 'max_depth and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if max_depth < 0 or limit < 0:
+            return Response(
+                {'error': 'max_depth and limit must not be negative'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        comments = list(
+            Comment.objects.filter(issue=issue)
+            .select_related('author')
+            .order_by('created_at', 'id')[:limit + 1]
+        )
+        truncated = len(comments) > limit
+        rows = CommentNodeSerializer(comments[:limit], many=True, context={'request': request}).data
+        flat = request.query_params.get('shape') == 'flat'
+        return Response({
+            'results': build_comment_tree(rows, max_depth=max_depth, flat=flat),
+            'truncated': truncated,
+        })
+    
     @action(detail=True, methods=['patch'], permission_classes=[permissions.IsAuthenticated])
     def update_status(self, request, pk=None):
         issue = self.get_object()
@@ -179,49 +347,333 @@ class IssueViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         new_status = request.data.get('status')
-        old_status = issue.status
         if new_status not in StatusChoices.values:
             return Response(
                 {'error': 'Invalid status'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        IssueStatusHistory.objects.create(
-            issue=issue,
-            changed_by=request.user,
-            old_status=old_status,
-            new_status=new_status,
-            comment=request.data.get('comment', '')
-        )
-        issue.status = new_status
-        if new_status == StatusChoices.RESOLVED:
-            issue.resolved_at = timezone.now()
-        issue.save()
+        with transaction.atomic():
+            issue = Issue.objects.select_for_update().get(pk=issue.pk)
+            old_status = issue.status
+            before = issue_snapshot(issue)
+            IssueStatusHistory.objects.create(
+                issue=issue,
+                changed_by=request.user,
+                old_status=old_status,
+                new_status=new_status,
+                comment=request.data.get('comment', '')
+            )
+            issue.status = new_status
+            if new_status == StatusChoices.RESOLVED:
+                issue.resolved_at = timezone.now()
+            issue.save(update_fields=['status', 'resolved_at', 'updated_at'])
+            record_changes([(before, issue_snapshot(issue))])
+        notify(NotificationChoices.ISSUE_UPDATED, issue, request.user, status=new_status)
+        publish_issue_event(issue, 'status_changed', status=new_status)
         return Response(
             {'message': f'Status updated successfully to {new_status}'},
             status=status.HTTP_200_OK
         )
+    
+    def _bulk_items(self, request, key):
+        items = request.data.get(key)
+        if not isinstance(items, list) or not items:
+            return None, Response(
+                {'error': f'{key} must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return None, Response(
+                {'error': f'At most {settings.BULK_MAX_ITEMS} {key} per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+    
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create many issues in one transaction; nothing is written unless all are valid"""
+        items, error = self._bulk_items(request, 'issues')
+        if error:
+            return error
+        serializer = IssueCreateSerializer(data=items, many=True, context=self.get_serializer_context())
+        if not serializer.is_valid():
+            return Response(
+                {'results': [{'index': i, 'errors': errors} for i, errors in enumerate(serializer.errors) if errors]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        issues = []
+        for data in serializer.validated_data:
+            data.pop('images', None)
+            issue = Issue(reporter=request.user, **data)
+            issue.severity = PRIORITY_SEVERITY[issue.priority]
+            issue.due_at = issue.compute_due_at()
+            issues.append(issue)
+        with transaction.atomic():
+            auto_assign(issues)
+            Issue.objects.bulk_create(issues)
+            record_changes([(None, issue_snapshot(issue)) for issue in issues])
+            update_search_vectors(Issue.objects.filter(pk__in=[issue.pk for issue in issues]))
+            index_issues(issues)
+            for issue in issues:
+                notify(NotificationChoices.ISSUE_CREATED, issue, request.user)
+        return Response(
+            {'results': [{'index': i, 'id': issue.pk} for i, issue in enumerate(issues)]},
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """Apply many status transitions with one history insert and one issue update"""
+        if request.user.role not in ['admin', 'staff', 'maintenance']:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        items, error = self._bulk_items(request, 'updates')
+        if error:
+            return error
+        serializer = BulkStatusUpdateSerializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {'results': [{'index': i, 'errors': errors} for i, errors in enumerate(serializer.errors) if errors]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        updates = serializer.validated_data
+        now = timezone.now()
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update().in_bulk({item['id'] for item in updates})
+            missing = [
+                {'index': i, 'errors': {'id': ['Issue not found']}}
+                for i, item in enumerate(updates) if item['id'] not in issues
+            ]
+            if missing:
+                return Response({'results': missing}, status=status.HTTP_400_BAD_REQUEST)
+            history = []
+            results = []
+            before = {pk: issue_snapshot(issue) for pk, issue in issues.items()}
+            for i, item in enumerate(updates):
+                issue = issues[item['id']]
+                history.append(IssueStatusHistory(
+                    issue=issue,
+                    changed_by=request.user,
+                    old_status=issue.status,
+                    new_status=item['status'],
+                    comment=item['comment']
+                ))
+                issue.status = item['status']
+                if item['status'] == StatusChoices.RESOLVED:
+                    issue.resolved_at = now
+                issue.updated_at = now
+                results.append({'index': i, 'id': issue.pk, 'status': issue.status})
+            IssueStatusHistory.objects.bulk_create(history)
+            Issue.objects.bulk_update(issues.values(), ['status', 'resolved_at', 'updated_at'])
+            record_changes([(before[pk], issue_snapshot(issue)) for pk, issue in issues.items()])
+            for issue in issues.values():
+                notify(NotificationChoices.ISSUE_UPDATED, issue, request.user, status=issue.status)
+                publish_issue_event(issue, 'status_changed', status=issue.status)
+        return Response({'results': results})
         
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CachedReferenceMixin:
+    """Serves list/retrieve from the reference cache with ETag revalidation."""
+    reference_cache_name = None
+    
+    def _cached_response(self, request, build):
+        entry = reference_caches[self.reference_cache_name].get()
+        if etag_matches(request, entry.etag):
+            return not_modified(entry.etag)
+        response = build(entry)
+        response['ETag'] = entry.etag
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        def build(entry):
+            rows = [row for row in entry.rows if row['is_active']]
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(rows)
+        return self._cached_response(request, build)
+    
+    def retrieve(self, request, *args, **kwargs):
+        def build(entry):
+            try:
+                row = entry.by_id.get(int(kwargs[self.lookup_field]))
+            except ValueError:
+                row = None
+            if row is None or not row['is_active']:
+                return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(row)
+        return self._cached_response(request, build)
+
+
+class CategoryViewSet(CachedReferenceMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    reference_cache_name = 'category'
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(CachedReferenceMixin, viewsets.ModelViewSet):
     queryset = Location.objects.filter(is_active=True)
     serializer_class = LocationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    reference_cache_name = 'location'
     
 class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentCursorPagination
     
     def get_queryset(self):
         issue_id = self.kwargs.get('issue_pk')
         if issue_id:
-            return Comment.objects.filter(issue_id=issue_id)
-        return Comment.objects.all()
+            return Comment.objects.filter(issue_id=issue_id).select_related('author')
+        return Comment.objects.select_related('author')
+    
+    def _serialize(self, comments, many=False):
+        context = self.get_serializer_context()
+        context['reply_trees'] = reply_trees(comments if many else [comments], context)
+        return self.get_serializer(comments, many=many, context=context).data
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self._serialize(page, many=True))
+        return Response(self._serialize(list(queryset), many=True))
+    
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self._serialize(self.get_object()))
+    
+    def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(self._serialize(serializer.instance))
     
     def perform_create(self, serializer):
         issue_id = self.request.data.get('issue')
-        serializer.save(author=self.request.user, issue_id=issue_id)
\ No newline at end of file
+        comment = serializer.save(author=self.request.user, issue_id=issue_id)
+        notify(NotificationChoices.COMMENT_ADDED, comment.issue, self.request.user)
+        publish_issue_event(comment.issue, 'comment_added', comment=comment.pk, parent=comment.parent_id)
+
+
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedCursorPagination
+    filterset_fields = ['is_read', 'notification_type']
+    
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).select_related('sender')
+    
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'unread': Notification.objects.filter(recipient=request.user, is_read=False).count()})
+    
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """Mark the given notification ids, or everything with {"all": true}, as read"""
+        notifications = Notification.objects.filter(recipient=request.user, is_read=False)
+        if not request.data.get('all'):
+            ids = request.data.get('ids')
+            if not isinstance(ids, list):
+                return Response(
+                    {'error': 'ids must be a list, or pass all=true'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            notifications = notifications.filter(pk__in=ids)
+        return Response({'updated': notifications.update(is_read=True)})
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Dashboard figures read from the rollup tables, never from Issue itself"""
+    permission_classes = [permissions.IsAuthenticated]
+    group_fields = {'location': 'location_id', 'category': 'category_id', 'status': 'status'}
+    
+    def _scope(self, queryset, request):
+        for param in ('location', 'category'):
+            value = request.query_params.get(param)
+            if value:
+                if not value.isdigit():
+                    return None, Response({'error': f'{param} must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(**{f'{param}_id': int(value)})
+        return queryset, None
+    
+    @action(detail=False, methods=['get'])
+    def status_counts(self, request):
+        """Current issue counts, grouped by ?group_by=location,category,status; ?status=open keeps open ones"""
+        if request.user.role not in ['admin', 'staff']:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        group_by = [name for name in request.query_params.get('group_by', 'status').split(',') if name]
+        unknown = set(group_by) - self.group_fields.keys()
+        if unknown:
+            return Response(
+                {'error': f'Cannot group by {", ".join(sorted(unknown))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows, error = self._scope(IssueStatusCount.objects.filter(count__gt=0), request)
+        if error:
+            return error
+        status_filter = request.query_params.get('status')
+        if status_filter == 'open':
+            rows = rows.filter(status__in=OPEN_STATUSES)
+        elif status_filter:
+            rows = rows.filter(status=status_filter)
+        columns = [self.group_fields[name] for name in group_by]
+        results = [
+            {**{name: row[self.group_fields[name]] for name in group_by}, 'count': row['issues']}
+            for row in rows.values(*columns).annotate(issues=Sum('count')).order_by(*columns)
+        ]
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def daily(self, request):
+        """Created/resolved counts, mean time to resolve and SLA breaches per day between ?start and ?end"""
+        if request.user.role not in ['admin', 'staff']:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        today = timezone.localdate()
+        try:
+            end = parse_date(request.query_params['end']) if 'end' in request.query_params else today
+            start = parse_date(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=29)
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response({'error': 'start and end must be dates (YYYY-MM-DD), start <= end'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= settings.ANALYTICS_MAX_DAYS:
+            return Response({'error': f'At most {settings.ANALYTICS_MAX_DAYS} days per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        rows, error = self._scope(IssueDailyStats.objects.filter(day__range=(start, end)), request)
+        if error:
+            return error
+        rows = rows.values('day').annotate(
+            created_total=Sum('created'),
+            resolved_total=Sum('resolved'),
+            seconds_total=Sum('resolution_seconds'),
+            tracked_total=Sum('sla_tracked'),
+            breached_total=Sum('sla_breached'),
+        ).order_by('day')
+        
+        def figures(created, resolved, seconds, tracked, breached):
+            return {
+                'created': created,
+                'resolved': resolved,
+                'mean_time_to_resolve': seconds / resolved if resolved else None,
+                'sla_tracked': tracked,
+                'sla_breached': breached,
+            }
+        
+        results = []
+        totals = [0, 0, 0, 0, 0]
+        for row in rows:
+            values = [row['created_total'], row['resolved_total'], row['seconds_total'],
+                      row['tracked_total'], row['breached_total']]
+            totals = [total + value for total, value in zip(totals, values)]
+            results.append({'day': row['day'], **figures(*values)})
+        return Response({'start': start, 'end': end, 'totals': figures(*totals), 'results': results})
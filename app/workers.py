@@ -0,0 +1,31 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import close_old_connections, transaction
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(name, max_workers):
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return _executors[name]
+
+
+def _run(func, args):
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def submit_after_commit(name, max_workers, func, *args):
+    """
+    Run ``func(*args)`` on the named in-process thread pool once the current
+    transaction commits. With ``max_workers=0`` it runs inline after commit.
+    """
+    if not max_workers:
+        transaction.on_commit(lambda: func(*args))
+        return
+    transaction.on_commit(lambda: _get_executor(name, max_workers).submit(_run, func, args))
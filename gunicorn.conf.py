@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the production server: `gunicorn -c gunicorn.conf.py`.
+Sizes come from unifix/settings.py so they can be tuned through the same env.
+"""
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'unifix.settings')
+
+from unifix import settings  # noqa: E402
+
+if settings.WEB_WORKERS > 1 and not settings.CACHE_SHARED:
+    raise RuntimeError(
+        f"WEB_WORKERS={settings.WEB_WORKERS} needs a shared CACHE_BACKEND such as "
+        "django.core.cache.backends.redis.RedisCache; LocMemCache is per process"
+    )
+
+bind = settings.WEB_BIND
+workers = settings.WEB_WORKERS
+timeout = settings.WEB_TIMEOUT
+graceful_timeout = settings.WEB_TIMEOUT
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = '-'
+
+if settings.WEB_SERVER == 'asgi':
+    wsgi_app = 'unifix.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'unifix.wsgi:application'
+    worker_class = 'gthread'
+    threads = settings.WEB_THREADS
+
+# Load Django and the apps once in the master so workers fork warm. The
+# autoreloader needs a fresh import per worker, so DEBUG turns preloading off.
+reload = settings.DEBUG
+preload_app = not reload
+
+
+def post_fork(server, worker):
+    # Never share a socket opened in the master with a forked worker.
+    from django.db import connections
+    connections.close_all()